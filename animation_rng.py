@@ -0,0 +1,84 @@
+import random
+from array import array
+
+
+class AnimationRNG:
+    """Seeded random source for the animation hot path.
+
+    Glyph indices, intensities and probabilities are generated a block at a
+    time with random.choices() and handed out as slices, so the per-cell
+    cost is an index into a buffer rather than a randrange()/randint() call.
+    A block is regenerated when it runs out. The stream only depends on the
+    seed, so the same seed and the same sequence of steps give the same
+    frames.
+    """
+
+    def __init__(self, glyph_count, intensity_levels, seed=None, block_size=8192):
+        self.random = random.Random(seed)
+        self.glyph_values = range(glyph_count)
+        self.intensity_values = range(1, intensity_levels + 1)
+        self.block_size = block_size
+        self._refill_cells()
+        self._refill_chances()
+
+    def _refill_cells(self):
+        choices, size = self.random.choices, self.block_size
+        self.glyph_block = array('H', choices(self.glyph_values, k=size))
+        self.intensity_block = bytearray(choices(self.intensity_values, k=size))
+        self._cell_pos = 0
+
+    def _refill_chances(self):
+        rand = self.random.random
+        self.chance_block = array('d', [rand() for _ in range(self.block_size)])
+        self._chance_pos = 0
+
+    def cells(self, n):
+        # (glyph indices, intensities) for n new background cells
+        i = self._cell_pos
+        if i + n > self.block_size:
+            if n > self.block_size:
+                choices = self.random.choices
+                return (array('H', choices(self.glyph_values, k=n)),
+                        bytearray(choices(self.intensity_values, k=n)))
+            self._refill_cells()
+            i = 0
+        self._cell_pos = i + n
+        return self.glyph_block[i:i + n], self.intensity_block[i:i + n]
+
+    def cell(self):
+        i = self._cell_pos
+        if i >= self.block_size:
+            self._refill_cells()
+            i = 0
+        self._cell_pos = i + 1
+        return self.glyph_block[i], self.intensity_block[i]
+
+    def chances(self, n):
+        # n uniform floats in [0, 1)
+        i = self._chance_pos
+        if i + n > self.block_size:
+            if n > self.block_size:
+                rand = self.random.random
+                return array('d', [rand() for _ in range(n)])
+            self._refill_chances()
+            i = 0
+        self._chance_pos = i + n
+        return self.chance_block[i:i + n]
+
+    def chance(self):
+        i = self._chance_pos
+        if i >= self.block_size:
+            self._refill_chances()
+            i = 0
+        self._chance_pos = i + 1
+        return self.chance_block[i]
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.chance()
+
+    def randrange(self, n):
+        return min(int(self.chance() * n), n - 1)
+
+    def choice(self, seq):
+        return seq[self.randrange(len(seq))]
+
@@ -0,0 +1,199 @@
+import curses
+import os
+import select
+import signal
+import sys
+
+from attr_table import BACKGROUND_PAIR, CRYPTO_PAIR, FADE_PAIRS
+
+# RGB for the color names accepted by --bg-color and --crypto-color
+COLOR_RGB = {
+    'red': (255, 60, 60),
+    'green': (0, 255, 70),
+    'blue': (70, 130, 255),
+    'yellow': (255, 225, 0),
+    'cyan': (0, 225, 255),
+    'magenta': (255, 70, 255),
+    'white': (235, 235, 235),
+}
+
+RESET = '\x1b[0m'
+
+
+def color_depth_from_env():
+    # Terminals that support 24-bit color advertise it in COLORTERM
+    return 'truecolor' if os.environ.get('COLORTERM', '').lower() in ('truecolor', '24bit') else '256'
+
+
+def rgb_to_256(red, green, blue):
+    # Nearest color on the xterm 6x6x6 color cube
+    return 16 + 36 * round(red / 255 * 5) + 6 * round(green / 255 * 5) + round(blue / 255 * 5)
+
+
+def sgr(rgb, depth, bold=False):
+    red, green, blue = (max(0, min(255, int(c))) for c in rgb)
+    color = f"38;2;{red};{green};{blue}" if depth == 'truecolor' else f"38;5;{rgb_to_256(red, green, blue)}"
+    return f"\x1b[0;{'1;' if bold else ''}{color}m"
+
+
+def scale(rgb, factor):
+    return tuple(c * factor for c in rgb)
+
+
+class AnsiStyles:
+    """SGR sequence for every attribute an AttrTable hands out.
+
+    Background intensity levels become a brightness gradient of the
+    background color (256-color or truecolor) and the fade rows at the
+    screen edges darker shades of it, instead of curses' dim/bold bits.
+    Attributes that aren't in the table fall back to plain or bold default
+    color.
+    """
+
+    def __init__(self, attrs, colors, depth='256'):
+        levels = attrs.intensity_levels
+        background = colors['background']
+        fade_steps = len(FADE_PAIRS)
+        table = {}
+        for intensity in range(levels + 1):
+            # Level 1 is the brightest, the last level 40% as bright
+            brightness = 1.0 - 0.6 * max(intensity - 1, 0) / max(levels - 1, 1)
+            table[attrs.background_attr(BACKGROUND_PAIR, intensity)] = sgr(scale(background, brightness), depth)
+            for step, pair in enumerate(FADE_PAIRS):
+                shade = brightness * (step + 1) / (fade_steps + 1)
+                table[attrs.background_attr(pair, intensity)] = sgr(scale(background, shade), depth)
+        for step, pair in enumerate(FADE_PAIRS):
+            table[attrs.ticker_attr(pair)] = sgr(scale(background, (step + 1) / (fade_steps + 1)), depth, bold=True)
+        table[attrs.ticker_attr(CRYPTO_PAIR)] = sgr(colors['crypto'], depth, bold=True)
+        table[attrs.lead] = sgr(colors['lead'], depth, bold=True)
+        table[attrs.up] = sgr(colors['up'], depth, bold=True)
+        table[attrs.down] = sgr(colors['down'], depth, bold=True)
+        table[0] = RESET
+        self.table = table
+
+    def __call__(self, attr):
+        style = self.table.get(attr)
+        if style is None:
+            style = self.table[attr] = '\x1b[0;1m' if attr & curses.A_BOLD else RESET
+        return style
+
+
+class AnsiScreen:
+    """Terminal output written as raw ANSI/VT sequences instead of through curses.
+
+    Implements the part of the curses window API the display uses. addstr()
+    only queues cells; refresh() sorts the frame's cells by position and
+    builds them into one string, moving the cursor only where the next cell
+    isn't the one after the last, changing SGR only where the attribute
+    changes, and sends it with a single write. Unix only (termios).
+    """
+
+    def __init__(self, styles=None, infd=None, outfd=None):
+        self.infd = sys.stdin.fileno() if infd is None else infd
+        self.outfd = sys.stdout.fileno() if outfd is None else outfd
+        self.styles = styles or (lambda attr: RESET)
+        self.height, self.width = self._terminal_size()
+        self._cells = []  # (index, char, attr) queued since the last refresh
+        self._clear = True
+        self._resized = False
+        self._saved_termios = None
+        self._saved_winch = None
+        self.bytes_written = 0
+
+    def _terminal_size(self):
+        size = os.get_terminal_size(self.outfd)
+        return size.lines, size.columns
+
+    def start(self):
+        import termios
+        import tty
+        self._saved_termios = termios.tcgetattr(self.infd)
+        tty.setcbreak(self.infd)  # Unbuffered keys without echo; Ctrl+C still interrupts
+        self._saved_winch = signal.signal(signal.SIGWINCH, self._on_winch)
+        self._write('\x1b[?1049h\x1b[?25l')  # Alternate screen, hide the cursor; the first refresh clears it
+
+    def stop(self):
+        import termios
+        self._write(RESET + '\x1b[?25h\x1b[?1049l')
+        if self._saved_winch is not None:
+            signal.signal(signal.SIGWINCH, self._saved_winch)
+        if self._saved_termios is not None:
+            termios.tcsetattr(self.infd, termios.TCSADRAIN, self._saved_termios)
+
+    def _on_winch(self, signum, frame):
+        self._resized = True
+
+    def _write(self, text):
+        data = text.encode()
+        view = memoryview(data)
+        while view:
+            written = os.write(self.outfd, view)
+            view = view[written:]
+        self.bytes_written += len(data)
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def nodelay(self, flag):
+        pass  # getch() never blocks
+
+    def getch(self):
+        if self._resized:
+            self._resized = False
+            self.height, self.width = self._terminal_size()
+            self._clear = True
+            return curses.KEY_RESIZE
+        if select.select([self.infd], [], [], 0)[0]:
+            data = os.read(self.infd, 1)
+            return data[0] if data else -1
+        return -1
+
+    def addstr(self, y, x, text, attr=0):
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            raise curses.error('addstr() returned ERR')
+        i = y * self.width + x
+        for char in text[:self.width - x]:
+            self._cells.append((i, char, attr))
+            i += 1
+
+    def erase(self):
+        self._cells.clear()
+        self._clear = True
+
+    def refresh(self):
+        cells = self._cells
+        if not cells and not self._clear:
+            return
+        parts = []
+        if self._clear:
+            parts.append(RESET + '\x1b[2J')
+            self._clear = False
+        cells.sort()
+        styles, width = self.styles, self.width
+        cursor = -1  # Screen index the cursor is at, or -1 when unknown
+        current_attr = None
+        for i, char, attr in cells:
+            if i != cursor:
+                y, x = divmod(i, width)
+                if cursor >= 0 and cursor // width == y and i > cursor:
+                    parts.append(f"\x1b[{i - cursor}C")  # Forward on the same row
+                else:
+                    parts.append(f"\x1b[{y + 1};{x + 1}H")
+            if attr != current_attr:
+                parts.append(styles(attr))
+                current_attr = attr
+            parts.append(char)
+            # After the last column the cursor position depends on the terminal's wrap handling
+            cursor = i + 1 if (i + 1) % width else -1
+        cells.clear()
+        self._write(''.join(parts))
+
+
+def wrapper(func, *args, **kwargs):
+    # Like curses.wrapper(): set the terminal up, run func(screen), and restore the terminal even on errors
+    screen = AnsiScreen()
+    screen.start()
+    try:
+        return func(screen, *args, **kwargs)
+    finally:
+        screen.stop()
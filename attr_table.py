@@ -0,0 +1,52 @@
+import curses
+
+BACKGROUND_PAIR = 1
+FADE_PAIRS = range(2, 9)  # Pair 2 is the outermost row of the fade, pair 8 the innermost
+LEAD_PAIR = 9
+CRYPTO_PAIR = 10
+UP_PAIR = 11  # Tickers whose price rose since the last poll
+DOWN_PAIR = 12  # and those whose price fell
+
+
+class AttrTable:
+    """Curses attributes precomputed for every screen row.
+
+    background[row][intensity] is the attribute of a background cell,
+    lead is the attribute of the leading character of a column,
+    ticker[row] is the attribute of a crypto ticker cell and up/down are
+    those of tickers colored by price trend. Rebuild with build() when the
+    screen height changes.
+    """
+
+    def __init__(self, height, fade_length, intensity_levels, color_pair=curses.color_pair):
+        self.fade_length = fade_length
+        self.intensity_levels = intensity_levels
+        self.color_pair = color_pair
+        self.lead = color_pair(LEAD_PAIR) | curses.A_BOLD
+        self.up = color_pair(UP_PAIR) | curses.A_BOLD
+        self.down = color_pair(DOWN_PAIR) | curses.A_BOLD
+        self.build(height)
+
+    def _row_pair(self, row, height, default_pair):
+        fade_length = self.fade_length
+        if fade_length > 0:
+            if row < fade_length:
+                return min(FADE_PAIRS[-1], FADE_PAIRS[0] + row)
+            if row > height - fade_length:
+                return min(FADE_PAIRS[-1], FADE_PAIRS[0] + (height - row))
+        return default_pair
+
+    def background_attr(self, pair, intensity):
+        return self.color_pair(pair) | curses.A_DIM * intensity
+
+    def ticker_attr(self, pair):
+        return self.color_pair(pair) | curses.A_BOLD
+
+    def build(self, height):
+        levels = range(self.intensity_levels + 1)
+        self.height = height
+        self.background = [
+            tuple(self.background_attr(self._row_pair(row, height, BACKGROUND_PAIR), intensity) for intensity in levels)
+            for row in range(height)
+        ]
+        self.ticker = [self.ticker_attr(self._row_pair(row, height, CRYPTO_PAIR)) for row in range(height)]
@@ -0,0 +1,147 @@
+import asyncio
+import curses
+
+from frame_stream import AttrTranslator, CELL, HEADER, KEYFRAME, DiffScreen, encode_keyframe, paint
+from headless import NullScreen
+
+# Clients receive frames encoded by frame_stream and send a single b'K' byte
+# to ask for a fresh keyframe, e.g. after their terminal was resized.
+
+
+def parse_address(text):
+    # "unix:/path/to.sock", "HOST:PORT" or ":PORT" (localhost); returns (path, None) or (host, port)
+    if text.startswith('unix:'):
+        return text[len('unix:'):], None
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class BroadcastScreen(DiffScreen):
+    # Headless screen whose frames are broadcast; keeps the full picture for clients that join or fall behind
+    def __init__(self, height, width):
+        super().__init__(NullScreen(height, width))
+
+    def keyframe(self):
+        return encode_keyframe(self.screen)
+
+
+class BroadcastClient:
+    __slots__ = ('writer', 'stale')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.stale = True  # Needs a keyframe before diffs make sense to it
+
+
+class BroadcastServer:
+    """Streams the frames of one BroadcastScreen to any number of socket clients.
+
+    send_frame() never waits on a client. A client whose socket buffer holds
+    more than max_buffer bytes is skipped for that frame and marked stale,
+    and gets a keyframe of the current screen once it has caught up, so a
+    slow viewer drops frames instead of holding back the others.
+    """
+
+    def __init__(self, address, screen, max_buffer=256 * 1024):
+        self.address = address
+        self.screen = screen
+        self.max_buffer = max_buffer
+        self.clients = set()
+        self.frames_dropped = 0
+        self._server = None
+
+    async def start(self):
+        host, port = parse_address(self.address)
+        if port is None:
+            self._server = await asyncio.start_unix_server(self._handle_client, host)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, host, port)
+
+    async def _handle_client(self, reader, writer):
+        client = BroadcastClient(writer)
+        self.clients.add(client)
+        try:
+            while True:
+                request = await reader.read(1)
+                if not request:
+                    break
+                if request == KEYFRAME:
+                    client.stale = True
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def send_frame(self):
+        message = self.screen.take_frame()
+        keyframe = None
+        for client in self.clients:
+            writer = client.writer
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                client.stale = True
+                self.frames_dropped += 1
+            elif client.stale:
+                if keyframe is None:
+                    keyframe = message if message is not None and message[:1] == KEYFRAME else self.screen.keyframe()
+                writer.write(keyframe)
+                client.stale = False
+            elif message is not None:
+                writer.write(message)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for client in list(self.clients):
+            client.writer.close()
+
+
+async def open_connection(address):
+    host, port = parse_address(address)
+    if port is None:
+        return await asyncio.open_unix_connection(host)
+    return await asyncio.open_connection(host, port)
+
+
+async def run_client(stdscr, address, key_interval=0.05):
+    """Paint the frames a BroadcastServer sends until a key is pressed or the server goes away.
+
+    Returns True when the user quit and False when the connection ended.
+    """
+    reader, writer = await open_connection(address)
+    translate = AttrTranslator()
+    quit_event = asyncio.Event()
+
+    async def paint_frames():
+        while True:
+            kind, _, _, count = HEADER.unpack(await reader.readexactly(HEADER.size))
+            paint(stdscr, kind, await reader.readexactly(count * CELL.size), translate)
+            stdscr.refresh()
+
+    async def watch_keys():
+        # Polled rather than registered with the event loop so it also works on Windows
+        while True:
+            key = stdscr.getch()
+            if key == curses.KEY_RESIZE:
+                writer.write(KEYFRAME)
+            elif key != -1:
+                quit_event.set()
+                return
+            await asyncio.sleep(key_interval)
+
+    painter = asyncio.ensure_future(paint_frames())
+    keys = asyncio.ensure_future(watch_keys())
+    try:
+        await asyncio.wait([painter, keys], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        painter.cancel()
+        keys.cancel()
+        writer.close()
+    if painter.done() and not painter.cancelled():
+        error = painter.exception()
+        if not isinstance(error, (asyncio.IncompleteReadError, ConnectionError)):
+            raise error  # The server closing the connection is the only expected way for paint_frames() to end
+    return quit_event.is_set()
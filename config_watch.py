@@ -0,0 +1,106 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+
+# inotify(7) constants and the fixed part of each event read from the descriptor
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT = struct.Struct('iIII')  # watch descriptor, mask, cookie, length of the name that follows
+
+
+class PollingWatcher:
+    """Notices changed files by comparing their mtime, size and inode.
+
+    poll() stats the files at most every `interval` seconds and is free the
+    rest of the time, so it can be called every frame.
+    """
+
+    def __init__(self, paths, interval=1.0, clock=time.monotonic):
+        self.paths = list(paths)
+        self.interval = interval
+        self.clock = clock
+        self._next_check = clock() + interval
+        self._stamps = {path: self._stamp(path) for path in self.paths}
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def poll(self):
+        # Paths that changed since the last call; empty most of the time
+        now = self.clock()
+        if now < self._next_check:
+            return []
+        self._next_check = now + self.interval
+        changed = []
+        for path in self.paths:
+            stamp = self._stamp(path)
+            if stamp != self._stamps[path]:
+                self._stamps[path] = stamp
+                changed.append(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Notices changed files through Linux inotify, without polling the disk.
+
+    Watches the directories holding the files, so files replaced by a rename
+    (as the list builder and most editors save) are still seen. poll() is a
+    single non-blocking read.
+    """
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}  # (watch descriptor, file name) -> path as given
+        for path in paths:
+            directory, name = os.path.split(os.path.abspath(path))
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                error = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(error, f"Cannot watch {directory}")
+            self.paths[(wd, os.fsencode(name))] = path
+
+    def poll(self):
+        changed = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = EVENT.unpack_from(data, offset)
+                name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b'\0')
+                offset += EVENT.size + length
+                path = self.paths.get((wd, name))
+                if path is not None and path not in changed:
+                    changed.append(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def watch_files(paths, interval=1.0):
+    # inotify on Linux, mtime polling elsewhere or when inotify is unavailable (e.g. out of watches)
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths, interval)
@@ -1,36 +1,9 @@
-import requests
-import json
+# Run this file to pull the top 20 Ethereum ecosystem tokens, formatted with their id, ticker, and name, ready for use
+# Thin wrapper around list_builder.py; run that directly for other categories, limits or output files.
 
-def fetch_ethereum_ecosystem_cryptos():
-    url = "https://api.coingecko.com/api/v3/coins/markets"
-    params = {
-        'vs_currency': 'usd',
-        'category': 'ethereum-ecosystem',
-        'order': 'market_cap_desc',
-        'per_page': 20,  # Adjust the number of coins as needed
-        'page': 1
-    }
-    response = requests.get(url, params=params, timeout=10)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Failed to fetch Eth ecosystem coins: {response.status_code}")
-        return []
+import sys
 
-def save_crypto_list(crypto_data, filename="ethereum_ecosystem_crypto_list.json"):
-    config = {
-        "cryptos": [{
-            "id": crypto['id'],
-            "ticker": crypto['symbol'].upper(),
-            "name": crypto['name']
-        } for crypto in crypto_data]
-    }
-    
-    with open(filename, 'w') as file:
-        json.dump(config, file, indent=4)
-
-    print(f"Configuration saved to {filename}")
+from list_builder import main
 
 if __name__ == '__main__':
-    ethereum_cryptos = fetch_ethereum_ecosystem_cryptos()
-    save_crypto_list(ethereum_cryptos)
\ No newline at end of file
+    sys.exit(main(['--category', 'ethereum-ecosystem', '--limit', '20', '--output', 'ethereum_ecosystem_crypto_list.json'] + sys.argv[1:]))
@@ -0,0 +1,178 @@
+# Local stand-in for a streaming price feed: serves random-walk price ticks as line-delimited JSON,
+# for trying out and load-testing matrix_crypto.py --provider stream without any network service.
+#
+# Examples:
+#   python feed_generator.py --listen :8765 --rate 50
+#   python feed_generator.py --listen unix:/tmp/feed.sock --coins 10000 --rate 5000 --write-list feed_list.json
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+
+from broadcast import parse_address
+from price_cache import write_json_atomic
+from watchlist import load_list
+
+
+class FeedGenerator:
+    """Random-walk prices for a set of coins, sent as ticks to every connected client.
+
+    Each tick moves one random coin's price. `rate` ticks per second are
+    spread over `sends_per_second` writes; with batch set, each write is a
+    single {"id": price, ...} line instead of one line per tick. A client
+    whose socket buffer is over max_buffer misses ticks (counted in
+    dropped) rather than slowing the others down.
+    """
+
+    def __init__(self, prices, rate=20.0, batch=False, sends_per_second=100, volatility=0.002, max_buffer=1 << 20,
+                 seed=None):
+        self.prices = dict(prices)
+        self.ids = list(self.prices)
+        self.rate = rate
+        self.batch = batch
+        self.sends_per_second = sends_per_second
+        self.volatility = volatility
+        self.max_buffer = max_buffer
+        self.random = random.Random(seed)
+        self.clients = set()
+        self._handlers = set()
+        self.sent = 0
+        self.dropped = 0
+        self._server = None
+
+    async def start(self, address):
+        host, port = parse_address(address)
+        if port is None:
+            self._server = await asyncio.start_unix_server(self._handle_client, host)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, host, port)
+
+    async def _handle_client(self, reader, writer):
+        self._handlers.add(asyncio.current_task())
+        self.clients.add(writer)
+        # Start every client off with the full price list, then ticks
+        writer.write(json.dumps(self.prices, separators=(',', ':')).encode() + b'\n')
+        try:
+            while await reader.read(1024):
+                pass  # Clients have nothing to say; this just notices when they leave
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def ticks(self, count):
+        # Move `count` random coins one step each; returns the encoded lines
+        ticks = {}
+        choice, gauss = self.random.choice, self.random.gauss
+        for _ in range(count):
+            coin_id = choice(self.ids)
+            price = self.prices[coin_id] * math.exp(gauss(0.0, self.volatility))
+            self.prices[coin_id] = ticks[coin_id] = round(price, 8)
+        if self.batch:
+            return json.dumps(ticks, separators=(',', ':')).encode() + b'\n'
+        return b''.join(json.dumps({'id': coin_id, 'price': price, 'time': round(time.time(), 3)},
+                                   separators=(',', ':')).encode() + b'\n' for coin_id, price in ticks.items())
+
+    def send(self, count):
+        if not self.clients:
+            return
+        data = self.ticks(count)
+        for writer in list(self.clients):
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                self.dropped += count
+            else:
+                writer.write(data)
+                self.sent += count
+
+    async def run(self, duration=None, report=None):
+        # Send ticks at `rate` until duration runs out (forever when None); report(stats) is called every second
+        loop = asyncio.get_running_loop()
+        started = next_report = loop.time()
+        owed = 0.0
+        last = started
+        last_sent = 0
+        while duration is None or loop.time() - started < duration:
+            await asyncio.sleep(1 / self.sends_per_second)
+            now = loop.time()
+            owed += (now - last) * self.rate
+            last = now
+            count = int(owed)
+            owed -= count
+            if count:
+                self.send(count)
+            if report is not None and now >= next_report:
+                report({'clients': len(self.clients), 'ticks_per_second': self.sent - last_sent,
+                        'sent': self.sent, 'dropped': self.dropped})
+                last_sent = self.sent
+                next_report = now + 1.0
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in list(self.clients):
+            writer.close()
+        # Closing a client ends its handler; let them finish instead of being cancelled at shutdown
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+
+def synthetic_prices(count, seed=None):
+    # coin-0 ... coin-N with log-uniform prices between a cent and 70,000
+    rng = random.Random(seed)
+    return {f"coin-{i}": round(math.exp(rng.uniform(math.log(0.01), math.log(70000))), 8) for i in range(count)}
+
+
+async def serve(args, prices):
+    generator = FeedGenerator(prices, args.rate, args.batch, seed=args.seed)
+    await generator.start(args.listen)
+    print(f"Serving {len(prices)} coins at {args.rate:g} ticks/s on {args.listen}, press Ctrl+C to stop.")
+
+    def report(stats):
+        print(f"\r{stats['clients']} clients, {stats['ticks_per_second']} ticks/s, {stats['sent']} sent, "
+              f"{stats['dropped']} dropped for slow clients ", end='', flush=True)
+
+    try:
+        await generator.run(args.duration, report)
+    finally:
+        await generator.close()
+        print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve random-walk price ticks as line-delimited JSON for --provider stream.")
+    parser.add_argument('--listen', type=str, default=':8765', help='Address to serve on: HOST:PORT, :PORT (localhost) or unix:PATH.')
+    parser.add_argument('--config', type=str, default='crypto_list.json', help='Crypto list whose coins get ticks.')
+    parser.add_argument('--coins', type=int, help='Tick this many synthetic coins (coin-0, coin-1, ...) instead of a crypto list.')
+    parser.add_argument('--write-list', type=str, metavar='PATH', help='With --coins, also write a crypto list of the synthetic coins to show them.')
+    parser.add_argument('--rate', type=float, default=20.0, help='Ticks per second, summed over all coins.')
+    parser.add_argument('--batch', action='store_true', help='Send each round of ticks as one {"id": price, ...} line instead of one line per tick.')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds.')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible prices and ticks.')
+    args = parser.parse_args(argv)
+
+    if args.coins:
+        prices = synthetic_prices(args.coins, args.seed)
+        if args.write_list:
+            write_json_atomic(args.write_list, {'cryptos': [{'id': coin_id, 'ticker': f"C{coin_id[5:]}", 'name': coin_id}
+                                                            for coin_id in prices]}, indent=4)
+    else:
+        rng = random.Random(args.seed)
+        prices = {crypto['id']: round(math.exp(rng.uniform(math.log(0.01), math.log(70000))), 8)
+                  for crypto in load_list(args.config)['cryptos']}
+    try:
+        asyncio.run(serve(args, prices))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import curses
+
+
+class FrameBuffer:
+    """Front/back cell buffer that only sends changed cells to the screen.
+
+    Each frame is drawn into the back buffer with put(). flush() compares it
+    against the front buffer (what the terminal currently shows) and only calls
+    addstr for cells whose char or attribute differ. Instead of scanning the
+    whole screen, flush() only visits cells drawn this frame plus cells that
+    were lit last frame, so the cost follows the number of visible glyphs
+    rather than the terminal area.
+    """
+
+    def __init__(self, height, width):
+        self.cells_written = 0  # Cells sent to the screen by the last flush
+        self.total_cells_written = 0
+        self.frames = 0
+        self.resize(height, width)
+
+    def resize(self, height, width):
+        self.height = height
+        self.width = width
+        size = height * width
+        self.back_chars = [' '] * size
+        self.back_attrs = [0] * size
+        self.front_chars = [' '] * size
+        self.front_attrs = [0] * size
+        self._touched = []  # Indices drawn into the back buffer this frame
+        self._lit = []  # Indices that are non-blank in the front buffer
+        self._needs_clear = True
+
+    def put(self, y, x, char, attr):
+        if 0 <= y < self.height and 0 <= x < self.width:
+            i = y * self.width + x
+            self.back_chars[i] = char
+            self.back_attrs[i] = attr
+            self._touched.append(i)
+
+    def flush(self, screen):
+        back_chars, back_attrs = self.back_chars, self.back_attrs
+        front_chars, front_attrs = self.front_chars, self.front_attrs
+        touched = self._touched
+        width = self.width
+
+        if self._needs_clear:
+            screen.erase()
+            for i in self._lit:
+                front_chars[i] = ' '
+                front_attrs[i] = 0
+            self._lit = []
+            self._needs_clear = False
+
+        written = 0
+        for cells in (touched, self._lit):
+            for i in cells:
+                char = back_chars[i]
+                attr = back_attrs[i]
+                if char != front_chars[i] or attr != front_attrs[i]:
+                    front_chars[i] = char
+                    front_attrs[i] = attr
+                    y, x = divmod(i, width)
+                    try:
+                        screen.addstr(y, x, char, attr)
+                    except curses.error:
+                        pass
+                    written += 1
+
+        # Cells lit in the new front buffer are the ones drawn this frame
+        self._lit = [i for i in touched if back_chars[i] != ' ']
+
+        # Reset the back buffer for the next frame
+        for i in touched:
+            back_chars[i] = ' '
+            back_attrs[i] = 0
+        touched.clear()
+
+        self.cells_written = written
+        self.total_cells_written += written
+        self.frames += 1
+        return written
+
+    def average_cells_written(self):
+        return self.total_cells_written / self.frames if self.frames else 0.0
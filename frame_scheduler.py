@@ -0,0 +1,91 @@
+import time
+
+
+class FrameScheduler:
+    """Paces the animation loop to a target frame rate.
+
+    Each frame asks start_frame() how much simulation to run, checks
+    should_render() before drawing, and calls wait() at the end to sleep only
+    for whatever is left of the frame budget.
+
+    With sim_hz set, the simulation advances in fixed steps that are separate
+    from the render rate. When a frame overruns its budget the next frame skips
+    rendering (up to max_frame_skip in a row) instead of slowing the simulation
+    down. After idle_after rendered frames that changed no cells, the loop drops
+    to idle_fps until something visible changes again.
+    """
+
+    MAX_FRAME_DT = 0.25  # Longest gap simulated in one frame, e.g. after the process was suspended
+
+    def __init__(self, fps, sim_hz=None, idle_fps=4, idle_after=30, max_frame_skip=5,
+                 clock=time.perf_counter, sleep=time.sleep):
+        self.budget = 1.0 / fps
+        self.idle_budget = 1.0 / idle_fps if idle_fps else self.budget
+        self.sim_step = 1.0 / sim_hz if sim_hz else None
+        self.idle_after = idle_after
+        self.max_frame_skip = max_frame_skip
+        self.clock = clock
+        self.sleep = sleep
+
+        now = clock()
+        self.last_time = now
+        self.deadline = now
+        self.accumulator = 0.0
+        self.behind = False
+        self.skipped_in_row = 0
+        self.idle_frames = 0
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+
+    @property
+    def idle(self):
+        return self.idle_frames >= self.idle_after
+
+    def start_frame(self):
+        # Returns (steps, dt): run scene.update(dt) steps times this frame
+        now = self.clock()
+        elapsed = min(now - self.last_time, self.MAX_FRAME_DT)
+        self.last_time = now
+        self.deadline += self.idle_budget if self.idle else self.budget
+
+        if self.sim_step is None:
+            return 1, elapsed
+
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.sim_step)
+        self.accumulator -= steps * self.sim_step
+        return steps, self.sim_step
+
+    def should_render(self):
+        if self.behind and self.skipped_in_row < self.max_frame_skip:
+            self.skipped_in_row += 1
+            self.frames_skipped += 1
+            return False
+        self.skipped_in_row = 0
+        return True
+
+    def frame_rendered(self, cells_written):
+        self.frames_rendered += 1
+        if cells_written:
+            if self.idle:
+                # Something is moving again, so pick the full frame rate back up from now
+                self.deadline = self.clock()
+            self.idle_frames = 0
+        else:
+            self.idle_frames += 1
+
+    def time_left(self):
+        # Seconds left of this frame's budget; call once per frame, e.g. to sleep in an event loop instead of wait()
+        remaining = self.deadline - self.clock()
+        if remaining > 0:
+            self.behind = False
+            return remaining
+        # Overran the budget: skip the next render and don't try to make up the lost time
+        self.behind = True
+        self.deadline = self.clock()
+        return 0.0
+
+    def wait(self):
+        remaining = self.time_left()
+        if remaining > 0:
+            self.sleep(remaining)
@@ -0,0 +1,92 @@
+import curses
+import struct
+
+# Encoded frames: a header followed by `count` cells.
+# A keyframe (b'K') clears the screen before its cells are painted, a diff (b'D') only changes the cells it lists.
+HEADER = struct.Struct('!cHHI')  # kind, height, width, cell count
+CELL = struct.Struct('!HHII')  # y, x, code point, attribute
+KEYFRAME = b'K'
+DIFF = b'D'
+
+PAIR_MASK = 0xff00  # Color pair bits of an attribute built with headless.color_pair()
+
+
+class DiffScreen:
+    """Wraps a screen and records the cells written to it since the last frame.
+
+    Rendering into it costs one struct pack per changed cell on top of the
+    wrapped screen's own addstr. take_frame() returns the encoded frame: a
+    keyframe when the screen was erased since the last call (FrameBuffer
+    repaints every lit cell after an erase), a diff otherwise.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.cells = bytearray()
+        self.count = 0
+        self.erased = False
+
+    def getmaxyx(self):
+        return self.screen.getmaxyx()
+
+    def addstr(self, y, x, text, attr=0):
+        self.screen.addstr(y, x, text, attr)
+        cells = self.cells
+        for i, char in enumerate(text):
+            cells += CELL.pack(y, x + i, ord(char), attr)
+        self.count += len(text)
+
+    def erase(self):
+        self.screen.erase()
+        self.erased = True
+        self.cells.clear()
+        self.count = 0
+
+    def refresh(self):
+        self.screen.refresh()
+
+    def take_frame(self):
+        # The encoded frame, or None if nothing changed since the last call
+        if not self.erased and not self.count:
+            return None
+        height, width = self.screen.getmaxyx()
+        message = HEADER.pack(KEYFRAME if self.erased else DIFF, height, width, self.count) + bytes(self.cells)
+        self.cells.clear()
+        self.count = 0
+        self.erased = False
+        return message
+
+
+def encode_keyframe(screen):
+    # Everything currently shown on a NullScreen, as a keyframe
+    chars, attrs, width = screen.chars, screen.attrs, screen.width
+    lit = [i for i, char in enumerate(chars) if char != ' ']
+    cells = b''.join(CELL.pack(i // width, i % width, ord(chars[i]), attrs[i]) for i in lit)
+    return HEADER.pack(KEYFRAME, screen.height, width, len(lit)) + cells
+
+
+def paint(screen, kind, body, translate=None):
+    # Apply one decoded frame to a screen; returns the number of cells painted
+    if kind == KEYFRAME:
+        screen.erase()
+    count = 0
+    for y, x, code, attr in CELL.iter_unpack(body):
+        try:
+            screen.addstr(y, x, chr(code), translate(attr) if translate else attr)
+        except curses.error:
+            pass  # Outside this screen, which may be smaller than the one the frame was rendered on
+        count += 1
+    return count
+
+
+class AttrTranslator:
+    # Maps attributes built with headless.color_pair() to this terminal's curses attributes
+    def __init__(self):
+        self._cache = {}
+
+    def __call__(self, attr):
+        translated = self._cache.get(attr)
+        if translated is None:
+            translated = curses.color_pair((attr & PAIR_MASK) >> 8) | (attr & ~PAIR_MASK)
+            self._cache[attr] = translated
+        return translated
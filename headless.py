@@ -0,0 +1,62 @@
+import curses
+
+
+def color_pair(n):
+    # Same bit layout as curses.color_pair(), which can't be called without a real terminal
+    return n << 8
+
+
+class NullScreen:
+    """Headless stand-in for a curses window.
+
+    Exposes the part of the window API the display uses (getmaxyx, addstr,
+    erase, refresh, getch, nodelay) and keeps the drawn cells in memory, so the
+    animation loop can be driven and inspected without a TTY.
+    """
+
+    def __init__(self, height, width, keys=()):
+        self.height = height
+        self.width = width
+        self.chars = [' '] * (height * width)
+        self.attrs = [0] * (height * width)
+        self.keys = list(keys)  # Scripted key presses returned by getch()
+        self.addstr_calls = 0
+        self.refreshes = 0
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        self.addstr_calls += 1
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            raise curses.error('addstr() returned ERR')
+        i = y * self.width + x
+        for char in text:
+            if i >= len(self.chars):
+                raise curses.error('addstr() returned ERR')
+            self.chars[i] = char
+            self.attrs[i] = attr
+            i += 1
+
+    def erase(self):
+        size = self.height * self.width
+        self.chars[:] = [' '] * size
+        self.attrs[:] = [0] * size
+
+    def refresh(self):
+        self.refreshes += 1
+
+    def nodelay(self, flag):
+        pass
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+    def resize(self, height, width):
+        self.height = height
+        self.width = width
+        self.chars = [' '] * (height * width)
+        self.attrs = [0] * (height * width)
+
+    def row_text(self, y):
+        return ''.join(self.chars[y * self.width:(y + 1) * self.width])
@@ -0,0 +1,126 @@
+# Build or refresh a crypto list JSON file from CoinGecko market data, ready for use with matrix_crypto.py
+#
+# Examples:
+#   python list_builder.py --limit 20 --output crypto_list.json
+#   python list_builder.py --category solana-ecosystem --limit 500 --output solana_ecosystem_crypto_list.json
+
+import argparse
+import json
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from price_cache import write_json_atomic
+from price_client import CoinGeckoClient, PriceFetchError, COINGECKO_API_URL
+
+MAX_PER_PAGE = 250  # Largest page CoinGecko's /coins/markets endpoint returns
+
+
+def fetch_market_coins(client, limit, category=None, per_page=MAX_PER_PAGE, workers=3):
+    # Fetch the top `limit` coins by market cap, requesting the pages concurrently
+    per_page = max(1, min(per_page, MAX_PER_PAGE, limit))
+    pages = math.ceil(limit / per_page)
+
+    def fetch_page(page):
+        params = {
+            'vs_currency': 'usd',
+            'order': 'market_cap_desc',
+            'per_page': per_page,
+            'page': page,
+            'sparkline': 'false',
+        }
+        if category:
+            params['category'] = category
+        data = client.get('coins/markets', params)
+        if not isinstance(data, list):
+            raise PriceFetchError(f"Unexpected response for page {page}: {str(data)[:200]}")
+        return data
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, pages))) as executor:
+        results = list(executor.map(fetch_page, range(1, pages + 1)))
+
+    coins = []
+    seen = set()
+    for page in results:
+        for coin in page:
+            # Market caps shift between page requests, so a coin can show up on two pages
+            if coin['id'] not in seen:
+                seen.add(coin['id'])
+                coins.append(coin)
+    return coins[:limit]
+
+
+def load_crypto_list(path):
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {'cryptos': []}
+
+
+def merge_crypto_list(existing, coins, exclude=(), limit=None):
+    """Merge freshly fetched coins into an existing list config.
+
+    Coins keep the order of the market data, up to limit coins after
+    exclusions. Entries already in the list are reused as they are, so
+    hand-edited tickers, names or extra fields survive; other top-level keys
+    of the config are kept. Returns (config, changed), where changed is True
+    only when membership or order differs.
+    """
+    exclude = set(exclude)
+    current = {crypto['id']: crypto for crypto in existing.get('cryptos', [])}
+    cryptos = []
+    for coin in coins:
+        if coin['id'] in exclude:
+            continue
+        cryptos.append(current.get(coin['id']) or {
+            'id': coin['id'],
+            'ticker': coin['symbol'].upper(),
+            'name': coin['name'],
+        })
+        if limit is not None and len(cryptos) >= limit:
+            break
+    changed = [crypto['id'] for crypto in cryptos] != [crypto['id'] for crypto in existing.get('cryptos', [])]
+    config = dict(existing)
+    config['cryptos'] = cryptos
+    return config, changed
+
+
+def build_list(output, limit=20, category=None, exclude=(), workers=3, client=None):
+    client = client or CoinGeckoClient()
+    # Fetch enough extra coins to still fill the list after exclusions
+    coins = fetch_market_coins(client, limit + len(exclude), category, workers=workers)
+    config, changed = merge_crypto_list(load_crypto_list(output), coins, exclude, limit)
+    if changed:
+        write_json_atomic(output, config, indent=4)
+    return config, changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or refresh a crypto list JSON file from CoinGecko market data.")
+    parser.add_argument('--category', type=str, help='CoinGecko category id, e.g. solana-ecosystem or ethereum-ecosystem. Omit for the overall market.')
+    parser.add_argument('--limit', type=int, default=20, help='Number of coins to include, by market cap.')
+    parser.add_argument('--output', type=str, default='crypto_list.json', help='Crypto list file to create or update.')
+    parser.add_argument('--exclude', type=str, default='', help='Comma-separated coin ids to leave out (e.g. tether,usd-coin).')
+    parser.add_argument('--workers', type=int, default=3, help='Number of pages fetched in parallel.')
+    parser.add_argument('--api-url', type=str, default=COINGECKO_API_URL, help='Base URL of the CoinGecko-compatible API.')
+    parser.add_argument('--max-calls-per-minute', type=int, default=10, help='Cap on API calls per minute (0 disables the cap).')
+    args = parser.parse_args(argv)
+
+    client = CoinGeckoClient(args.api_url, args.max_calls_per_minute, pool_size=args.workers)
+    exclude = [coin_id.strip() for coin_id in args.exclude.split(',') if coin_id.strip()]
+    try:
+        config, changed = build_list(args.output, args.limit, args.category, exclude, args.workers, client)
+    except PriceFetchError as e:
+        print(f"Failed to fetch cryptocurrencies: {e}")
+        return 1
+
+    if changed:
+        print(f"Configuration saved to {args.output} ({len(config['cryptos'])} coins)")
+    else:
+        print(f"{args.output} is already up to date ({len(config['cryptos'])} coins)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
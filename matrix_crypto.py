@@ -1,12 +1,38 @@
+import time
+_import_started = time.perf_counter()  # For the startup benchmark
+
 import json
 import curses
-import time
 import threading
 import random
 import argparse
-from logging.handlers import TimedRotatingFileHandler
+import atexit
+import functools
+import hashlib
+import os
+import signal
+import sys
+import tracemalloc
+from array import array
 import logging
-import requests
+from frame_stream import AttrTranslator, DiffScreen
+from recording import Recorder, play
+from animation_rng import AnimationRNG
+from attr_table import AttrTable, BACKGROUND_PAIR, FADE_PAIRS, LEAD_PAIR, CRYPTO_PAIR, UP_PAIR, DOWN_PAIR
+from frame_buffer import FrameBuffer
+from spawn_scheduler import ColumnOccupancy, SpawnPicker
+from frame_scheduler import FrameScheduler
+from metrics import FrameStats, MetricsExporter, collect_metrics, draw_overlay, overlay_lines
+from price_client import CoinGeckoClient, PriceFetchError, COINGECKO_API_URL
+from price_cache import cache_path_for, load_price_cache, save_price_cache
+from price_history import CHANGE_WINDOWS, HistorySaver, PriceHistory, history_path_for, load_price_history
+from watchlist import WatchSource, load_watchlist, parse_source
+from price_providers import (PriceBoard, CoinGeckoProvider, FileProvider, ReplayProvider, NoPriceProvider,
+                             PolledProvider, record_snapshot)
+import headless
+
+# Importing this module has no side effects: arguments are parsed, logging is set up and the
+# slow imports (requests, NumPy, asyncio) are loaded only once main() needs them.
 
 # User-configurable settings
 SETTINGS = {
@@ -25,6 +51,8 @@ SETTINGS = {
     'LEAD_CHAR_COLOR': curses.COLOR_WHITE,  # Color of the leading character in each column.
     'LEAD_CHAR_CHANCE': 1,  # Chance of a new leading character appearing when the column updates.
     'CRYPTO_COLOR': 'white',  # Default color for crypto tickers
+    'UP_COLOR': 'green',  # Color of tickers whose price rose since the last poll
+    'DOWN_COLOR': 'red',  # Color of tickers whose price fell since the last poll
 }
 
 COLOR_MAP = {
@@ -39,51 +67,184 @@ COLOR_MAP = {
 
 log_file = 'matrix_crypto.log'
 logger = logging.getLogger("MatrixCryptoLogger")
-logger.setLevel(logging.INFO)
-
-handler = TimedRotatingFileHandler(log_file, when="D", interval=10, backupCount=5)
-handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-logger.addHandler(handler)
-
-# Update argument parser
-parser = argparse.ArgumentParser(description="Matrix-style crypto ticker display.")
-parser.add_argument('--bg-color', type=str, default='green', help='Color of the falling background text (e.g., green, red, white, blue, yellow, cyan, magenta).')
-parser.add_argument('--crypto-color', type=str, help='Color of the crypto tickers (e.g., white, yellow, cyan). Overrides SETTINGS["CRYPTO_COLOR"].')
-parser.add_argument('--solana', action='store_true', help='Use the Solana ecosystem crypto list.')
-parser.add_argument('--eth', action='store_true', help='Use the Ethereum ecosystem crypto list.')
-args = parser.parse_args()
-
-def load_cryptos(filename):
-    with open(filename, 'r') as file:
-        data = json.load(file)
-    return data
-
-if args.solana:
-    config_filename = "solana_ecosystem_crypto_list.json"
-elif args.eth:
-    config_filename = "ethereum_ecosystem_crypto_list.json"
-else:
-    config_filename = "crypto_list.json"
-
-def fetch_current_prices(crypto_list, config_name):
-    crypto_ids = [crypto['id'] for crypto in crypto_list]
-    base_url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {'ids': ','.join(crypto_ids), 'vs_currencies': 'usd'}
+
+def setup_logging():
+    from logging.handlers import TimedRotatingFileHandler
+    logger.setLevel(logging.INFO)
+    handler = TimedRotatingFileHandler(log_file, when="D", interval=10, backupCount=5)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+
+def spawn_factors(text):
+    factors = [factor.strip().lower() for factor in text.split(',') if factor.strip()]
+    unknown = [factor for factor in factors if factor not in ('market-cap', 'volatility')]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown spawn weighting {', '.join(unknown)} (use market-cap, volatility)")
+    return factors
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Matrix-style crypto ticker display.")
+    parser.add_argument('--bg-color', type=str, default='green', help='Color of the falling background text (e.g., green, red, white, blue, yellow, cyan, magenta).')
+    parser.add_argument('--crypto-color', type=str, help='Color of the crypto tickers (e.g., white, yellow, cyan). Overrides SETTINGS["CRYPTO_COLOR"].')
+    parser.add_argument('--top', action='store_true', help='Use the top 20 crypto list (the default when no other list is given).')
+    parser.add_argument('--solana', action='store_true', help='Use the Solana ecosystem crypto list.')
+    parser.add_argument('--eth', action='store_true', help='Use the Ethereum ecosystem crypto list.')
+    parser.add_argument('--config', type=str, action='append', help='Path to a crypto list JSON file, optionally with a display weight as PATH:WEIGHT. Can be repeated, and combined with --top, --solana and --eth.')
+    parser.add_argument('--provider', choices=['coingecko', 'file', 'replay', 'stream', 'none'], default='coingecko', help='Where prices come from: the CoinGecko API, a local JSON/CSV file (--price-file), a recording (--price-file, see --record-prices), a push feed of ticks (--feed), or none to show tickers only.')
+    parser.add_argument('--feed', type=str, default=':8765', metavar='ADDRESS', help='Line-delimited JSON tick feed for the "stream" provider, at HOST:PORT or unix:PATH (see feed_generator.py).')
+    parser.add_argument('--price-file', type=str, help='Price file for the "file" and "replay" providers.')
+    parser.add_argument('--replay-speed', type=float, default=1.0, help='Speed multiplier for the "replay" provider and for --replay (0 replays frames as fast as possible).')
+    parser.add_argument('--record-prices', type=str, help='Append every price update to this file so it can be replayed with --provider replay.')
+    parser.add_argument('--changes', type=str, default='', help='Comma-separated price changes to show after each price: poll (since the last update), 1h and/or 24h.')
+    parser.add_argument('--spawn-by', type=spawn_factors, default=[], help='Comma-separated extra weighting for which coins get a ticker: market-cap (higher ranked coins more often) and/or volatility (coins whose price is moving more often).')
+    parser.add_argument('--no-trend-colors', action='store_true', help='Do not color tickers by whether their price rose or fell since the last update.')
+    parser.add_argument('--output', choices=['curses', 'ansi'], default='curses', help='Terminal output: curses (default), or ANSI escape sequences written directly, one write per frame (Unix only).')
+    parser.add_argument('--color-depth', choices=['auto', '256', 'truecolor'], default='auto', help='Colors used by --output ansi; auto picks truecolor when $COLORTERM says the terminal supports it.')
+    parser.add_argument('--fps', type=float, help='Target frames per second. Defaults to 1 / SETTINGS["ANIMATION_SPEED"].')
+    parser.add_argument('--sim-hz', type=float, help='Run the simulation at a fixed rate (steps per second), separate from the render rate.')
+    parser.add_argument('--idle-fps', type=float, default=4, help='Frame rate used while nothing on screen is changing (0 disables idling).')
+    parser.add_argument('--no-watch-config', action='store_true', help='Do not reload the crypto lists when they change on disk.')
+    parser.add_argument('--price-worker', action='store_true', help='Fetch and format prices in a separate, supervised process that publishes them through shared memory, so price updates never stall the animation.')
+    parser.add_argument('--cache-ttl', type=float, default=75, help='Seconds a cached price snapshot counts as fresh; fresh caches skip the network fetch.')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the on-disk price cache.')
+    parser.add_argument('--no-history', action='store_true', help='Do not read or write the on-disk price history (changes then start empty on every run).')
+    parser.add_argument('--api-url', type=str, default=COINGECKO_API_URL, help='Base URL of the CoinGecko-compatible price API.')
+    parser.add_argument('--max-calls-per-minute', type=int, default=10, help='Cap on price API calls per minute (0 disables the cap).')
+    parser.add_argument('--chunk-size', type=int, default=250, help='Maximum number of coin ids per price request.')
+    parser.add_argument('--fetch-workers', type=int, default=4, help='Number of price requests made in parallel for large watchlists.')
+    parser.add_argument('--stats', action='store_true', help='Show the performance overlay (toggle with the "s" key).')
+    parser.add_argument('--metrics-file', type=str, help='Periodically write performance metrics to this file: Prometheus textfile format if it ends in .prom, JSON otherwise.')
+    parser.add_argument('--metrics-interval', type=float, default=15, help='Seconds between metrics file writes.')
+    parser.add_argument('--serve', type=str, metavar='ADDRESS', help='Run the display once without a terminal and stream it to --connect clients on HOST:PORT or unix:PATH.')
+    parser.add_argument('--connect', type=str, metavar='ADDRESS', help='Show the display streamed by a --serve instance at HOST:PORT or unix:PATH.')
+    parser.add_argument('--size', type=str, default='120x40', help='Screen size (WIDTHxHEIGHT) rendered by --serve.')
+    parser.add_argument('--record', type=str, metavar='PATH', help='Record the session (frames and price updates) to a compact binary file, e.g. session.mxr.')
+    parser.add_argument('--replay', type=str, metavar='PATH', help='Play back a session recorded with --record.')
+    parser.add_argument('--headless', action='store_true', help='With --replay, play into a headless screen and print playback statistics instead of drawing.')
+    parser.add_argument('--benchmark', action='store_true', help='Run the headless rendering benchmark instead of the display.')
+    parser.add_argument('--frames', type=int, default=500, help='Number of frames per benchmark run.')
+    parser.add_argument('--sizes', type=str, default='80x24,160x48,300x90,400x120', help='Comma-separated terminal sizes (WIDTHxHEIGHT) to benchmark.')
+    parser.add_argument('--patterns', type=str, help='Semicolon-separated background patterns to benchmark, e.g. "1,2,3,1;0". Defaults to SETTINGS["BACKGROUND_PATTERN"].')
+    parser.add_argument('--watchlist-sizes', type=str, default='20,200,2000', help='Comma-separated watchlist sizes to benchmark.')
+    parser.add_argument('--seed', type=int, help='Random seed for the animation. Seeded runs are frame-for-frame reproducible with a fixed --sim-hz; benchmarks default to 0.')
+    parser.add_argument('--benchmark-output', type=str, help='Write benchmark results to this JSON file.')
+    parser.add_argument('--engine', choices=['auto', 'numpy', 'python'], default='auto', help='Background simulation engine. "auto" uses NumPy when it is installed.')
+    parser.add_argument('--startup-benchmark', action='store_true', help='Measure the time from launch to the first frame over --startup-runs fresh processes.')
+    parser.add_argument('--startup-runs', type=int, default=10, help='Number of launches timed by --startup-benchmark.')
+    parser.add_argument('--first-frame', action='store_true', help=argparse.SUPPRESS)  # One --startup-benchmark run
+    return parser
+
+args = None  # Parsed command line, set by main()
+watch_sources = []
+
+def resolve_watch_sources(args):
+    # Lists to show; several lists are merged into one watchlist and each coin is fetched once
+    sources = [parse_source(config) for config in args.config or []]
+    if args.top:
+        sources.append(WatchSource("crypto_list.json", 1.0))
+    if args.solana:
+        sources.append(WatchSource("solana_ecosystem_crypto_list.json", 1.0))
+    if args.eth:
+        sources.append(WatchSource("ethereum_ecosystem_crypto_list.json", 1.0))
+    if not sources:
+        sources.append(WatchSource("crypto_list.json", 1.0))
+    return sources
+
+def fetch_current_prices(provider, board, crypto_ids, config_name, recorders=()):
     try:
-        response = requests.get(base_url, params=params, timeout=20)
-        prices = response.json()
-        for crypto in crypto_list:
-            if crypto['id'] in prices:
-                price = prices[crypto['id']]['usd']
-                crypto['price'] = "{:.2f}".format(price) if price < 1000 else "{:,.0f}".format(price)
-        logger.info(f"{config_name} prices updated successfully.")
-    except Exception as e:
-        logger.error(f"Error fetching prices for {config_name}: {e}")
+        prices, failed_ids = provider.fetch(crypto_ids)
+    except PriceFetchError as e:
+        logger.error(f"Error fetching prices for {config_name}: {e} (stats so far: {provider.stats()})")
+        return False
+    # The merged snapshot is published with one reference swap; coins that failed keep their last good price
+    snapshot = board.publish(prices)
+    for record in recorders:
+        record(snapshot, prices)
+    if failed_ids:
+        logger.warning(f"{config_name} prices partially updated from {provider.name}, {len(failed_ids)} coins kept their last price.")
+    else:
+        logger.info(f"{config_name} prices updated successfully from {provider.name} (snapshot {snapshot.version}).")
+    return True
+
+def load_cached_prices(board, cache_path, crypto_ids=()):
+    # Publish the cached snapshot if it is newer than what the board has.
+    # Returns the cache's age in seconds, or None if there is no usable cache for all of crypto_ids.
+    cached = load_price_cache(cache_path)
+    if cached is None:
+        return None
+    if cached.timestamp > board.snapshot.timestamp:
+        board.publish(cached.prices, cached.timestamp)
+    if any(coin_id not in cached.prices for coin_id in crypto_ids):
+        return None
+    return time.time() - cached.timestamp
+
+class PriceRequests:
+    # The coin ids the price thread polls. reload() swaps in a new list while it runs and wakes it to fetch added coins.
+    def __init__(self, watchlist):
+        self.ids = watchlist.ids
+        self.name = watchlist.name
+        self.added = []
+        self.wake = threading.Event()
+        self._lock = threading.Lock()
 
-def update_prices_periodically(crypto_list, config_name, update_interval=120):
+    def reload(self, watchlist, added):
+        with self._lock:
+            self.ids, self.name = watchlist.ids, watchlist.name
+            self.added.extend(added)
+        self.wake.set()
+
+    def take_added(self):
+        self.wake.clear()
+        with self._lock:
+            added, self.added = self.added, []
+        return added
+
+def update_prices_periodically(provider, board, requests, recorders=(), cache_path=None, cache_ttl=0):
+    if not isinstance(provider, PolledProvider):
+        raise TypeError(f"{provider.name} prices are not polled")
     while True:
-        fetch_current_prices(crypto_list, config_name)
-        time.sleep(update_interval)
+        crypto_ids, config_name = requests.ids, requests.name
+        # Another instance may have refreshed the shared cache since we last looked
+        age = load_cached_prices(board, cache_path, crypto_ids) if cache_path else None
+        if age is not None and 0 <= age < cache_ttl:
+            logger.info(f"{config_name} prices loaded from cache ({age:.0f}s old), skipping fetch.")
+            delay = cache_ttl - age
+        else:
+            if fetch_current_prices(provider, board, crypto_ids, config_name, recorders) and cache_path:
+                try:
+                    save_price_cache(cache_path, board.snapshot)
+                except OSError as e:
+                    logger.warning(f"Could not write price cache {cache_path}: {e}")
+            delay = provider.next_delay()
+        if delay is None:
+            return
+        # Sleep until the next poll, fetching coins added to the watchlist in the meantime right away
+        deadline = time.monotonic() + delay
+        while requests.wake.wait(max(0.0, deadline - time.monotonic())):
+            added = requests.take_added()
+            if added:
+                fetch_current_prices(provider, board, added, requests.name, recorders)
+
+def create_provider():
+    if args.provider == 'file':
+        return FileProvider(args.price_file)
+    if args.provider == 'replay':
+        return ReplayProvider(args.price_file, args.replay_speed)
+    if args.provider == 'none':
+        return NoPriceProvider()
+    if args.provider == 'stream':
+        from price_stream import StreamProvider
+        return StreamProvider(args.feed, interval=1 / target_fps())
+    client = CoinGeckoClient(args.api_url, args.max_calls_per_minute, chunk_size=args.chunk_size, max_workers=args.fetch_workers)
+    return CoinGeckoProvider(client, 75)
+
+def fade_color(color_code, step, steps):
+    # Darker shades of the color on 256-color terminals, the plain color otherwise
+    if curses.COLORS < 256 or not 0 < color_code < 8:
+        return color_code
+    level = 1 + step * 4 // max(steps - 1, 1)  # 1..5 on the xterm 6x6x6 color cube
+    red, green, blue = color_code & 1, (color_code >> 1) & 1, (color_code >> 2) & 1
+    return 16 + 36 * red * level + 6 * green * level + blue * level
 
 def init_color_pairs(bg_color, crypto_color):
     curses.start_color()
@@ -92,74 +253,220 @@ def init_color_pairs(bg_color, crypto_color):
     bg_color_code = COLOR_MAP.get(bg_color.lower(), curses.COLOR_GREEN)
     crypto_color_code = COLOR_MAP.get(crypto_color.lower(), curses.COLOR_WHITE)
     
-    curses.init_pair(1, bg_color_code, -1)
-    curses.init_pair(9, curses.COLOR_WHITE, -1)  # Lead character color
-    curses.init_pair(10, crypto_color_code, -1)  # Crypto ticker color
+    curses.init_pair(BACKGROUND_PAIR, bg_color_code, -1)
+    for step, pair in enumerate(FADE_PAIRS):  # Fade at the top and bottom edges when FADE_LENGTH > 0
+        curses.init_pair(pair, fade_color(bg_color_code, step, len(FADE_PAIRS)), -1)
+    curses.init_pair(LEAD_PAIR, curses.COLOR_WHITE, -1)  # Lead character color
+    curses.init_pair(CRYPTO_PAIR, crypto_color_code, -1)  # Crypto ticker color
+    curses.init_pair(UP_PAIR, COLOR_MAP.get(SETTINGS['UP_COLOR'], curses.COLOR_GREEN), -1)
+    curses.init_pair(DOWN_PAIR, COLOR_MAP.get(SETTINGS['DOWN_COLOR'], curses.COLOR_RED), -1)
+
+# Background glyphs as a tuple so indexing hands back the same str objects every frame
+BACKGROUND_GLYPHS = tuple(SETTINGS['BACKGROUND_CHARS'])
 
 class MatrixColumn:
-    def __init__(self, height):
+    # Column cells live in ring buffers: logical cell k of the column body is stored at
+    # (head + k) % size, so shifting the column down is a head decrement instead of list.insert(0, ...)
+    # All randomness comes from the scene's AnimationRNG, in slices where a step needs several values
+    __slots__ = ('height', 'length', 'glyphs', 'intensities', 'head', 'speed', 'counter', 'top', 'rng')
+
+    def __init__(self, height, rng):
+        self.rng = rng
         self.height = height
-        self.length = int(random.uniform(*SETTINGS['BACKGROUND_COLUMN_LENGTH_RANGE']) * height)
-        self.chars = [' '] * height
-        self.intensities = [1] * height
-        self.speed = random.uniform(*SETTINGS['BACKGROUND_FALL_SPEED_RANGE'])
+        self.length = int(rng.uniform(*SETTINGS['BACKGROUND_COLUMN_LENGTH_RANGE']) * height)
+        size = max(height, 1)
+        self.glyphs = array('H', bytes(2 * size))  # Indices into BACKGROUND_GLYPHS
+        self.intensities = bytearray(b'\x01' * size)
+        self.head = 0
+        self.speed = rng.uniform(*SETTINGS['BACKGROUND_FALL_SPEED_RANGE'])
         self.counter = 0
         self.top = -self.length  # Start above the screen
         self._initialize_column()
 
     def _initialize_column(self):
-        for i in range(self.length):
-            self.chars[i] = random.choice(SETTINGS['BACKGROUND_CHARS'])
-            self.intensities[i] = random.randint(1, SETTINGS['BACKGROUND_INTENSITY_LEVELS'])
+        self.head = 0
+        n = min(self.length, len(self.glyphs))
+        self.glyphs[:n], self.intensities[:n] = self.rng.cells(n)
 
     def update(self, dt):
         self.counter += dt
         if self.counter >= self.speed:
             self.counter = 0
             self.top += 1
+            glyphs, intensities = self.glyphs, self.intensities
+            size = len(glyphs)
+            rng = self.rng
             if self.top >= 0:
-                # Shift characters down
-                self.chars.pop()
-                self.intensities.pop()
-                # Add new character at the top
-                self.chars.insert(0, random.choice(SETTINGS['BACKGROUND_CHARS']))
-                self.intensities.insert(0, random.randint(1, SETTINGS['BACKGROUND_INTENSITY_LEVELS']))
-            
+                # Shift characters down and add a new character at the top
+                self.head = (self.head - 1) % size
+                glyphs[self.head], intensities[self.head] = rng.cell()
+
             # Randomly change some characters
-            for i in range(min(self.length, self.height)):
-                if random.random() < SETTINGS['BACKGROUND_CHANGE_CHANCE']:
-                    self.chars[i] = random.choice(SETTINGS['BACKGROUND_CHARS'])
-                    self.intensities[i] = random.randint(1, SETTINGS['BACKGROUND_INTENSITY_LEVELS'])
+            head = self.head
+            change_chance = SETTINGS['BACKGROUND_CHANGE_CHANCE']
+            changed = [i for i, chance in enumerate(rng.chances(min(self.length, self.height))) if chance < change_chance]
+            new_glyphs, new_intensities = rng.cells(len(changed))
+            for i, glyph, intensity in zip(changed, new_glyphs, new_intensities):
+                k = (head + i) % size
+                glyphs[k] = glyph
+                intensities[k] = intensity
 
             # Reset column if it's fully off-screen
             if self.top >= self.height:
                 self.top = -self.length
                 self._initialize_column()
 
-    def get_column(self):
-        visible_length = min(self.length, self.height - self.top)
-        column = []
-        for i in range(self.height):
-            if 0 <= i - self.top < visible_length:
-                char = self.chars[i - self.top]
-                intensity = self.intensities[i - self.top]
-                # Lead character is at the bottom, but not if it's at the very bottom of the screen
-                is_lead = (i - self.top == visible_length - 1) and (i < self.height - 1)
+    def resize(self, height):
+        # Keep the column's cells and its relative position and length on the new screen height
+        old_height = self.height
+        size = max(height, 1)
+        head = self.head
+        for buffer, fill in zip((self.glyphs, self.intensities), self.rng.cells(max(size - len(self.glyphs), 0))):
+            # Unroll the ring so logical cell k is at index k, then truncate or grow in place
+            buffer[:] = buffer[head:] + buffer[:head]
+            if size < len(buffer):
+                del buffer[size:]
             else:
-                char = ' '
-                intensity = 1
-                is_lead = False
-            column.append((char, intensity, is_lead))
-        return column
+                buffer.extend(fill)
+        self.head = 0
+        self.height = height
+        if old_height:
+            self.length = int(self.length * height / old_height)
+            self.top = int(self.top * height / old_height)
+        else:
+            # Created on a 0-row screen with length 0: roll a length for the new height, as the numpy engine does
+            self.length = int(self.rng.uniform(*SETTINGS['BACKGROUND_COLUMN_LENGTH_RANGE']) * height)
+            self.top = -self.length
+
+    def visible_span(self):
+        # Screen rows [start, stop) covered by the column body
+        return max(self.top, 0), min(self.top + self.length, self.height)
+
+    def draw(self, frame, x, attrs):
+        # Walk only the visible rows, straight out of the ring buffers
+        top, height = self.top, self.height
+        start, stop = self.visible_span()
+        # Lead character is at the bottom, but not if it's at the very bottom of the screen
+        lead_row = stop - 1 if stop < height else -1
+        glyphs, intensities = self.glyphs, self.intensities
+        offset = self.head - top
+        size = len(glyphs)
+        background, lead = attrs.background, attrs.lead
+        for y in range(start, stop):
+            k = (offset + y) % size
+            char = BACKGROUND_GLYPHS[glyphs[k]]
+            if char != ' ':  # Don't draw spaces
+                frame.put(y, x, char, lead if y == lead_row else background[y][intensities[k]])
+
+def background_column_xs(max_x):
+    # Number of columns follows the background pattern
+    count = 0
+    x = 0
+    while x < max_x:
+        for gap in SETTINGS['BACKGROUND_PATTERN']:
+            if x < max_x:
+                count += 1
+                x += 1
+            x += gap
+
+    # Screen x of each column, matching how the columns have always been laid out when drawn
+    xs = []
+    x = 0
+    for _ in range(count):
+        xs.append(x)
+        x += 1
+        x += SETTINGS['BACKGROUND_PATTERN'][x % len(SETTINGS['BACKGROUND_PATTERN'])]
+    return xs
+
+class ColumnBackground:
+    # Background simulated one MatrixColumn at a time in plain Python
+    def __init__(self, column_xs, height, rng):
+        self.xs = column_xs
+        self.rng = rng
+        self.columns = [MatrixColumn(height, rng) for _ in column_xs]
+
+    def update(self, dt):
+        for column in self.columns:
+            column.update(dt)
+
+    def draw(self, frame, attrs):
+        for column, x in zip(self.columns, self.xs):
+            column.draw(frame, x, attrs)
+
+    def resize(self, column_xs, height):
+        # Columns are laid out from the left, so only the right edge gains or loses columns
+        del self.columns[len(column_xs):]
+        for column in self.columns:
+            column.resize(height)
+        self.columns.extend(MatrixColumn(height, self.rng) for _ in range(len(column_xs) - len(self.columns)))
+        self.xs = column_xs
+
+def load_numpy_background():
+    # NumPy is optional, and slow enough to import that it is only loaded when the NumPy engine may be used
+    try:
+        from numpy_background import NumpyBackground
+    except ImportError:  # Fall back to per-column simulation
+        return None
+    return NumpyBackground
+
+def create_background(column_xs, height, rng, engine='auto', seed=None):
+    if engine in ('auto', 'numpy'):
+        NumpyBackground = load_numpy_background()
+        if NumpyBackground is not None:
+            return NumpyBackground(column_xs, height, SETTINGS, seed)  # Draws from its own seeded NumPy generator
+        if engine == 'numpy':
+            logger.warning("NumPy is not installed, falling back to the Python background engine.")
+    return ColumnBackground(column_xs, height, rng)
+
+def ticker_text(crypto, snapshot, history=None, windows=()):
+    if snapshot is None:
+        return f"{crypto['ticker']}".upper()  # Display only ticker symbol
+    text = f"{crypto['ticker']} ${snapshot.formatted.get(crypto['id'], 'N/A')}"  # the space after $ allows for a gap between $ and price number
+    if history is not None:
+        for window in windows:
+            change = history.change(crypto['id'], CHANGE_WINDOWS[window])
+            if change is not None:
+                text += f" {'' if window == 'poll' else window + ' '}{change:+.1f}%"
+    return text.upper()
+
+def price_trend(crypto, history):
+    # 1 if the price rose since the last poll, -1 if it fell, 0 otherwise
+    change = history.change(crypto['id']) if history is not None else None
+    if not change:
+        return 0
+    return 1 if change > 0 else -1
+
+class TickerTexts:
+    # Display text and trend per coin, worked out once per price snapshot version and shared by every display
+    def __init__(self, history=None, windows=(), trends=False):
+        self.history = history
+        self.windows = windows
+        self.trends = trends
+        self.version = None
+        self.texts = {}
+
+    def get(self, crypto, snapshot):
+        # Returns (text, trend)
+        version = snapshot.version if snapshot is not None else None
+        if version != self.version:
+            self.texts.clear()
+            self.version = version
+        entry = self.texts.get(crypto['id'])
+        if entry is None:
+            entry = self.texts[crypto['id']] = (ticker_text(crypto, snapshot, self.history, self.windows),
+                                                price_trend(crypto, self.history) if self.trends else 0)
+        return entry
 
 class CryptoDisplay:
-    def __init__(self, crypto, x, max_y):
+    def __init__(self, crypto, x, max_y, text='', speed=None):
         self.crypto = crypto
         self.x = x
         self.y = 0
         self.max_y = max_y
-        self.speed = random.uniform(*SETTINGS['CRYPTO_FALL_SPEED_RANGE'])
+        self.speed = speed if speed is not None else random.uniform(*SETTINGS['CRYPTO_FALL_SPEED_RANGE'])
         self.counter = 0
+        self.text = text  # Current display text and price trend; the scene refreshes them from the shared TickerTexts
+        self.trend = 0
 
     def update(self, dt):
         self.counter += dt
@@ -168,122 +475,654 @@ class CryptoDisplay:
             self.y += 1
 
     def is_offscreen(self):
-        return self.y > self.max_y + len(self.get_display_text())
+        return self.y > self.max_y + len(self.text)
+
+class Scene:
+    """Background columns, falling tickers and the frame buffer they draw into.
+
+    Holds everything the animation loop simulates, independent of the screen it
+    ends up on, so the same scene can be rendered to curses or to a headless
+    NullScreen.
+    """
+
+    def __init__(self, crypto_list, max_y, max_x, engine='auto', color_pair=curses.color_pair, seed=None, prices=None,
+                 weights=None, changes=(), trend_colors=False, volatility=False):
+        self.prices = prices  # PriceBoard, or None to show tickers without prices
+        self.volatility = volatility  # Whether coins that are moving get more airtime
+        self.set_watchlist(crypto_list, weights)
+        self.max_y = max_y
+        self.max_x = max_x
+        self.columns = ColumnOccupancy(max_x)  # Columns with a falling ticker, so new ones never land on top of it
+        self.rng = AnimationRNG(len(BACKGROUND_GLYPHS), SETTINGS['BACKGROUND_INTENSITY_LEVELS'], seed)
+        # Create matrix columns based on the background pattern
+        self.background = create_background(background_column_xs(max_x), max_y, self.rng, engine, seed)
+        self.crypto_displays = []
+        history = prices.history if prices is not None else None
+        self.ticker_texts = TickerTexts(history, changes, trend_colors)
+        self.frame = FrameBuffer(max_y, max_x)
+        self.attrs = AttrTable(max_y, SETTINGS['FADE_LENGTH'], SETTINGS['BACKGROUND_INTENSITY_LEVELS'], color_pair)
+
+    def snapshot(self):
+        return self.prices.snapshot if self.prices is not None else None
 
-    def get_display_text(self):
-        return f"{self.crypto['ticker']} ${self.crypto.get('price', 'N/A')}".upper()  # the space after $ allows for a gap between $ and price number
+    def set_watchlist(self, crypto_list, weights=None):
+        # New tickers come from the new list, picked by weight (None for equal airtime); tickers already falling finish their run
+        history = self.prices.history if self.volatility and self.prices is not None else None
+        self.crypto_list = crypto_list
+        self.spawn = SpawnPicker([crypto['id'] for crypto in crypto_list], weights, history)
+
+    def resize(self, max_y, max_x):
+        # Relayout in place for a new terminal size; columns and tickers that still fit carry on
+        self.max_y = max_y
+        self.max_x = max_x
+        self.background.resize(background_column_xs(max_x), max_y)
+        self.crypto_displays = [display for display in self.crypto_displays if display.x < max_x]
+        self.columns.resize(max_x, [display.x for display in self.crypto_displays])
+        for display in self.crypto_displays:
+            display.max_y = max_y
+        self.attrs.build(max_y)
+        self.frame.resize(max_y, max_x)
 
-def safe_addstr(stdscr, y, x, text, attr):
+    def update(self, dt):
+        self.background.update(dt)
+
+        # Text is picked up once per frame here, so the bounds check and the draw always agree
+        snapshot = self.snapshot()
+        ticker_texts = self.ticker_texts
+        for display in self.crypto_displays[:]:
+            display.update(dt)
+            display.text, display.trend = ticker_texts.get(display.crypto, snapshot)
+            if display.is_offscreen():
+                self.crypto_displays.remove(display)
+                self.columns.release(display.x)
+
+        # Add new crypto display if needed, in a column no other ticker is falling in
+        rng = self.rng
+        if self.crypto_list and len(self.crypto_displays) < SETTINGS['CRYPTO_DISPLAY_COUNT'] and rng.chance() < SETTINGS['CRYPTO_DISPLAY_CHANCE']:
+            x = self.columns.take_random(rng.chance())
+            if x is not None:
+                if snapshot is not None:
+                    self.spawn.refresh(snapshot.version)
+                new_crypto = self.crypto_list[self.spawn.pick(rng)]
+                text, trend = ticker_texts.get(new_crypto, snapshot)
+                new_display = CryptoDisplay(new_crypto, x, self.max_y, text, rng.uniform(*SETTINGS['CRYPTO_FALL_SPEED_RANGE']))
+                new_display.trend = trend
+                self.crypto_displays.append(new_display)
+
+    def draw(self):
+        frame = self.frame
+        self.background.draw(frame, self.attrs)
+
+        max_y = self.max_y
+        attrs = self.attrs
+        ticker_attrs = attrs.ticker
+        for display in self.crypto_displays:
+            text, x, top = display.text, display.x, display.y
+            trend_attr = attrs.up if display.trend > 0 else attrs.down if display.trend < 0 else None
+            # Only the characters that are on screen
+            for y in range(max(top, 0), min(top + len(text), max_y)):
+                frame.put(y, x, text[y - top], trend_attr or ticker_attrs[y])
+
+    def render(self, screen):
+        # Send the changed cells to the screen; returns the number of cells written
+        return self.frame.flush(screen)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def synthetic_watchlist(size):
+    crypto_list = [{'id': f"coin-{i}", 'ticker': f"C{i}", 'name': f"Coin {i}"} for i in range(size)]
+    board = PriceBoard()
+    board.publish({crypto['id']: random.uniform(0.01, 70000) for crypto in crypto_list})
+    return crypto_list, board
+
+def benchmark_scene(width, height, pattern, watchlist_size, frames, engine='auto', seed=0, dt=1 / 60):
+    saved_pattern = SETTINGS['BACKGROUND_PATTERN']
+    SETTINGS['BACKGROUND_PATTERN'] = pattern
     try:
-        stdscr.addstr(int(y), x, text, attr)
-    except curses.error:
-        pass
+        random.seed(seed)
+        screen = headless.NullScreen(height, width)
+        crypto_list, board = synthetic_watchlist(watchlist_size)
+        scene = Scene(crypto_list, height, width, engine, headless.color_pair, seed, board)
 
-def main(stdscr):
-    config = load_cryptos(config_filename)
-    crypto_list = config['cryptos']
+        frame_times = []
+        cells_written = 0
+        for _ in range(frames):
+            start = time.perf_counter()
+            scene.update(dt)
+            scene.draw()
+            cells_written += scene.render(screen)
+            frame_times.append(time.perf_counter() - start)
 
-    # Use command-line argument for crypto color if provided, otherwise use SETTINGS
+        # Separate pass for allocations, since tracing slows every frame down. A frame's allocations are the
+        # memory it added per source line (snapshot diff) or, where reset_peak exists (3.9+), its transient
+        # peak when that is larger, which also counts memory allocated and freed again within the frame
+        allocated = []
+        ignore_tracing = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        tracemalloc.start()
+        for _ in range(min(frames, 50)):
+            before = tracemalloc.take_snapshot().filter_traces(ignore_tracing)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+            scene.update(dt)
+            scene.draw()
+            scene.render(screen)
+            peak = tracemalloc.get_traced_memory()[1] - traced if hasattr(tracemalloc, 'reset_peak') else 0
+            after = tracemalloc.take_snapshot().filter_traces(ignore_tracing)
+            added = sum(stat.size_diff for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0)
+            allocated.append(max(added, peak))
+            del before, after
+        tracemalloc.stop()
+    finally:
+        SETTINGS['BACKGROUND_PATTERN'] = saved_pattern
+
+    total_time = sum(frame_times)
+    return {
+        'size': f"{width}x{height}",
+        'pattern': pattern,
+        'watchlist': watchlist_size,
+        'engine': type(scene.background).__name__,
+        'frames': frames,
+        'fps': frames / total_time if total_time else 0.0,
+        'p50_ms': percentile(frame_times, 0.5) * 1000,
+        'p99_ms': percentile(frame_times, 0.99) * 1000,
+        'alloc_kib_per_frame': sum(allocated) / len(allocated) / 1024 if allocated else 0.0,
+        'cells_per_frame': cells_written / frames if frames else 0.0,
+    }
+
+def run_benchmark():
+    seed = args.seed if args.seed is not None else 0
+    sizes = [tuple(int(n) for n in size.lower().split('x')) for size in args.sizes.split(',')]
+    if args.patterns:
+        patterns = [[int(gap) for gap in pattern.split(',')] for pattern in args.patterns.split(';')]
+    else:
+        patterns = [SETTINGS['BACKGROUND_PATTERN']]
+    watchlist_sizes = [int(size) for size in args.watchlist_sizes.split(',')]
+
+    print(f"{'size':>9} {'pattern':>12} {'coins':>6} {'engine':>17} {'fps':>9} {'p50 ms':>8} {'p99 ms':>8} {'alloc KiB':>10} {'cells':>8}")
+    results = []
+    for width, height in sizes:
+        for pattern in patterns:
+            for watchlist_size in watchlist_sizes:
+                result = benchmark_scene(width, height, pattern, watchlist_size, args.frames, args.engine, seed)
+                results.append(result)
+                print(f"{result['size']:>9} {','.join(map(str, pattern)):>12} {watchlist_size:>6} {result['engine']:>17} "
+                      f"{result['fps']:>9.1f} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+                      f"{result['alloc_kib_per_frame']:>10.1f} {result['cells_per_frame']:>8.1f}")
+
+    if args.benchmark_output:
+        with open(args.benchmark_output, 'w') as file:
+            json.dump({'seed': seed, 'results': results}, file, indent=4)
+        print(f"Benchmark results saved to {args.benchmark_output}")
+
+def price_store_paths(provider):
+    # (cache path, history path) kept next to the first crypto list; None for what isn't stored. Only polled
+    # network prices are cached, while the history is kept for every provider that shows prices
+    base = watch_sources[0].path
+    if len(watch_sources) > 1:
+        # Named after the whole set of lists, so instances showing different combinations don't overwrite each other's files
+        paths = sorted({os.path.abspath(source.path) for source in watch_sources})
+        digest = hashlib.sha1('\n'.join(paths).encode()).hexdigest()[:10]
+        root, ext = os.path.splitext(base)
+        base = f"{root}.{digest}{ext}"
+    cache_path = cache_path_for(base) if provider.cacheable and not args.no_cache else None
+    history_path = history_path_for(base) if provider.shows_prices and not args.no_history else None
+    return cache_path, history_path
+
+def log_history_error(error):
+    logger.warning(f"Could not write price history: {error}")
+
+class PriceFeed:
+    """The provider, board and background fetching behind a display.
+
+    start() begins fetching in a thread or, with --price-worker, in a
+    supervised worker process, or starts a push provider's stream.
+    set_watchlist() switches to an edited watchlist and keeps the prices of
+    the coins that are still on it.
+    """
+
+    def __init__(self, source, history, watchlist, use_worker=False, cache_path=None):
+        self.source = source  # The provider that fetches, here or in the worker
+        self.provider = source  # What the overlay and metrics ask for stats
+        self.history = history
+        self.use_worker = use_worker
+        self.cache_path = cache_path
+        self.recorders = []
+        self.requests = PriceRequests(watchlist)
+        self.supervisor = None
+        self.started = False
+        self.board = self._create_board(watchlist)
+
+    def _create_board(self, watchlist):
+        if not self.use_worker:
+            return PriceBoard(history=self.history)
+        from price_worker import PriceWorkerSupervisor, SharedPriceBoard, SharedPriceTable, WorkerProvider
+        table = SharedPriceTable.create(watchlist.ids)
+        self.supervisor = PriceWorkerSupervisor(run_price_worker, (args, watch_sources, watchlist, table.name), table,
+                                                on_exit=log_worker_exit)
+        atexit.register(self.supervisor.stop)
+        self.provider = WorkerProvider(self.source, table, self.supervisor)
+        board = SharedPriceBoard(table, history=self.history)
+        board.follow()
+        return board
+
+    def _record(self, snapshot, prices):
+        # Updates published by the worker are recorded here as the follower thread picks them up
+        for record in self.recorders:
+            record(snapshot, prices)
+
+    def start(self):
+        if self.started or not self.source.shows_prices:
+            return
+        self.started = True
+        if self.supervisor is not None:
+            self.board.on_update = self._record
+            self.supervisor.start()
+        elif self.source.push:
+            self.source.start(self.board, self.requests, self.recorders)
+        else:
+            threading.Thread(target=update_prices_periodically, args=(self.source, self.board, self.requests, self.recorders, self.cache_path, args.cache_ttl),
+                             daemon=True).start()
+
+    def set_watchlist(self, watchlist):
+        # Returns the ids that are new; they are fetched right away
+        old_ids = set(self.requests.ids)
+        added = [coin_id for coin_id in watchlist.ids if coin_id not in old_ids]
+        if self.supervisor is None:
+            self.requests.reload(watchlist, added if self.started else [])
+            return added
+        # The worker's table has one slot per coin, so a new list gets a new table and worker, seeded with the current prices
+        self.requests = PriceRequests(watchlist)
+        old_board, old_supervisor = self.board, self.supervisor
+        snapshot = old_board.snapshot
+        self.board = self._create_board(watchlist)
+        kept = {coin_id: price for coin_id, price in snapshot.prices.items() if coin_id in self.board.table.index}
+        if kept:
+            self.board.publish(kept, snapshot.timestamp)
+        old_supervisor.stop()
+        if self.started:
+            self.started = False
+            self.start()
+        return added
+
+def create_price_feed(watchlist, recorder=None):
+    # Create the provider, board and price fetching; nothing is fetched until feed.start(),
+    # so callers can get the first frame up before any network code loads.
+    provider = create_provider()
+    cache_path, history_path = price_store_paths(provider)
+    # Pick up the saved price history, and show last-known prices from the first frame instead of $N/A
+    history = (load_price_history(history_path) if history_path else None) or PriceHistory()
+    # Push providers apply ticks as they arrive, so they stay in this process
+    use_worker = args.price_worker and provider.shows_prices and not provider.push
+    feed = PriceFeed(provider, history, watchlist, use_worker, cache_path)
+    if cache_path:
+        load_cached_prices(feed.board, cache_path)
+
+    # The worker records and saves its own updates
+    if history_path and not feed.use_worker:
+        feed.recorders.append(HistorySaver(history_path, history, on_error=log_history_error))
+    if args.record_prices and not feed.use_worker:
+        feed.recorders.append(functools.partial(record_snapshot, args.record_prices))
+    if recorder is not None:
+        feed.recorders.append(recorder.prices)
+        if feed.board.snapshot.version:
+            recorder.prices(feed.board.snapshot, dict(feed.board.snapshot.prices))  # The cached prices shown from the start
+    return feed
+
+def log_worker_exit(exitcode, delay):
+    logger.error(f"Price worker exited with status {exitcode}, restarting it in {delay:.0f}s.")
+
+def publish_worker_stats(provider, table, parent_pid, interval=1.0):
+    # Share the worker's fetch stats with the display, and exit once the display process is gone
+    while os.getppid() == parent_pid:
+        table.write_stats(provider.stats())
+        time.sleep(interval)
+    os._exit(0)
+
+def run_price_worker(worker_args, sources, watchlist, table_name):
+    # Entry point of the --price-worker process: fetch, format and publish prices into the shared table
+    global args, watch_sources
+    args, watch_sources = worker_args, sources
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the whole process group; the display stops the worker
+    setup_logging()
+    from price_worker import SharedPriceBoard, SharedPriceTable
+    try:
+        table = SharedPriceTable.attach(table_name, watchlist.ids)
+        provider = create_provider()
+        cache_path, history_path = price_store_paths(provider)
+        history = (load_price_history(history_path) if history_path else None) or PriceHistory()
+        board = SharedPriceBoard(table, history=history)
+        recorders = [functools.partial(record_snapshot, args.record_prices)] if args.record_prices else []
+        if history_path:
+            recorders.append(HistorySaver(history_path, history, on_error=log_history_error))
+        threading.Thread(target=publish_worker_stats, args=(provider, table, os.getppid()), daemon=True).start()
+        logger.info(f"Price worker {os.getpid()} started for {watchlist.name}.")
+        update_prices_periodically(provider, board, PriceRequests(watchlist), recorders, cache_path, args.cache_ttl)
+    except Exception:
+        logger.exception("Price worker failed.")
+        sys.exit(1)
+
+def spawn_weights(watchlist):
+    # Per-coin spawn weights from the list weights, "priority" entries in the lists and --spawn-by market-cap,
+    # or None for equal airtime
+    weights = None
+    if len(watch_sources) > 1 or any(source.weight != 1.0 for source in watch_sources):
+        weights = list(watchlist.weights)
+    if any('priority' in crypto for crypto in watchlist.cryptos):
+        weights = weights or [1.0] * len(watchlist.cryptos)
+        for i, crypto in enumerate(watchlist.cryptos):
+            priority = crypto.get('priority', 1.0)
+            weights[i] *= priority if isinstance(priority, (int, float)) else 1.0
+    if 'market-cap' in args.spawn_by:
+        # Lists are in market-cap order, so rank stands in for market cap (Zipf-like: rank 1 gets twice rank 2's airtime)
+        weights = weights or [1.0] * len(watchlist.cryptos)
+        for i, rank in enumerate(watchlist.ranks):
+            weights[i] /= rank + 1
+    return weights
+
+def create_scene(watchlist, feed, max_y, max_x, color_pair=curses.color_pair):
+    changes = [window.strip().lower() for window in args.changes.split(',') if window.strip()]
+    unknown = [window for window in changes if window not in CHANGE_WINDOWS]
+    if unknown:
+        logger.warning(f"Ignoring unknown --changes {', '.join(unknown)} (use {', '.join(CHANGE_WINDOWS)}).")
+        changes = [window for window in changes if window in CHANGE_WINDOWS]
+    return Scene(watchlist.cryptos, max_y, max_x, args.engine, color_pair, args.seed, prices=feed.board if feed.source.shows_prices else None,
+                 weights=spawn_weights(watchlist), changes=changes, trend_colors=not args.no_trend_colors,
+                 volatility='volatility' in args.spawn_by)
+
+def create_config_watcher():
+    from config_watch import watch_files
+    return None if args.no_watch_config else watch_files([source.path for source in watch_sources])
+
+def reload_watchlist(watchlist, feed, scene):
+    # Re-read the crypto lists after one changed on disk and apply the difference; returns the watchlist now in use.
+    # A list that doesn't load or validate leaves the display as it was.
+    try:
+        new_watchlist = load_watchlist(watch_sources)
+        if not new_watchlist.cryptos:
+            raise ValueError("no cryptos left to show")
+    except (OSError, ValueError) as e:
+        logger.error(f"Ignoring the changed crypto list {watchlist.name}: {e}")
+        return watchlist
+    added = feed.set_watchlist(new_watchlist)
+    scene.set_watchlist(new_watchlist.cryptos, spawn_weights(new_watchlist))
+    if scene.prices is not None:
+        scene.prices = feed.board  # A new board when the price worker was restarted for the new list
+    removed = set(watchlist.ids).difference(new_watchlist.ids)
+    logger.info(f"Reloaded {new_watchlist.name}: {len(added)} coins added, {len(removed)} removed, "
+                f"{len(new_watchlist.cryptos)} in the list.")
+    return new_watchlist
+
+def target_fps():
+    return args.fps if args.fps else 1 / SETTINGS['ANIMATION_SPEED']
+
+def create_scheduler():
+    return FrameScheduler(target_fps(), args.sim_hz, args.idle_fps)
+
+async def serve_frames(scene, scheduler, server, watchlist, feed):
+    # Simulate and render once, then hand each frame's changed cells to every connected client
+    import asyncio
+    await server.start()
+    logger.info(f"Serving {scene.max_x}x{scene.max_y} display on {server.address}.")
+    watcher = create_config_watcher()
+    try:
+        while True:
+            if watcher is not None and watcher.poll():
+                watchlist = reload_watchlist(watchlist, feed, scene)
+            steps, dt = scheduler.start_frame()
+            for _ in range(steps):
+                scene.update(dt)
+
+            if scheduler.should_render():
+                scene.draw()
+                scheduler.frame_rendered(scene.render(server.screen))
+                server.send_frame()
+
+            await asyncio.sleep(scheduler.time_left())
+    finally:
+        await server.close()
+
+def serve():
+    import asyncio
+    from broadcast import BroadcastScreen, BroadcastServer
+    width, height = (int(n) for n in args.size.lower().split('x'))
+    watchlist = load_watchlist(watch_sources)
+    feed = create_price_feed(watchlist)
+    feed.start()
+    scene = create_scene(watchlist, feed, height, width, headless.color_pair)
+    scheduler = create_scheduler()
+    server = BroadcastServer(args.serve, BroadcastScreen(height, width))
+    print(f"Serving on {args.serve}, press Ctrl+C to stop.")
+    try:
+        asyncio.run(serve_frames(scene, scheduler, server, watchlist, feed))
+    except KeyboardInterrupt:
+        logger.info('Graceful shutdown initiated by user.')
+    finally:
+        logger.info(f"Frames rendered: {scheduler.frames_rendered}, skipped: {scheduler.frames_skipped}, "
+                    f"dropped for slow clients: {server.frames_dropped}")
+
+def connect(stdscr):
+    import asyncio
+    from broadcast import run_client
     crypto_color = args.crypto_color if args.crypto_color else SETTINGS['CRYPTO_COLOR']
     init_color_pairs(args.bg_color, crypto_color)
+    curses.curs_set(0)
+    stdscr.nodelay(1)
+    try:
+        if not asyncio.run(run_client(stdscr, args.connect)):
+            logger.info(f"Connection to {args.connect} closed by the server.")
+    except OSError as e:
+        logger.error(f"Could not connect to {args.connect}: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        curses.curs_set(1)
 
-    curses.curs_set(0)  # Hide the cursor
+def replay(stdscr):
+    crypto_color = args.crypto_color if args.crypto_color else SETTINGS['CRYPTO_COLOR']
+    init_color_pairs(args.bg_color, crypto_color)
+    curses.curs_set(0)
+    stdscr.nodelay(1)
+    try:
+        # Any key other than a resize ends playback
+        play(args.replay, stdscr, args.replay_speed, AttrTranslator(),
+             stop=lambda: stdscr.getch() not in (-1, curses.KEY_RESIZE))
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not replay {args.replay}: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        curses.curs_set(1)
+
+def replay_headless():
+    # Play a recording into a headless screen, e.g. as a benchmark on real traffic
+    screen = headless.NullScreen(0, 0)
+    result = play(args.replay, screen, args.replay_speed, resize=screen.resize)
+    print(f"{result['frames']} frames ({result['recorded_seconds']:.1f}s recorded) replayed in {result['wall_seconds']:.2f}s: "
+          f"{result['fps']:.1f} fps, p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms, "
+          f"{result['cells_per_frame']:.1f} cells/frame")
+    if args.benchmark_output:
+        with open(args.benchmark_output, 'w') as file:
+            json.dump({'recording': args.replay, 'speed': args.replay_speed, 'results': [result]}, file, indent=4)
+        print(f"Replay results saved to {args.benchmark_output}")
+
+def ansi_styles(attrs, bg_color, crypto_color):
+    from ansi_screen import COLOR_RGB, AnsiStyles, color_depth_from_env
+    colors = {
+        'background': COLOR_RGB.get(bg_color.lower(), COLOR_RGB['green']),
+        'crypto': COLOR_RGB.get(crypto_color.lower(), COLOR_RGB['white']),
+        'lead': COLOR_RGB['white'],
+        'up': COLOR_RGB.get(SETTINGS['UP_COLOR'], COLOR_RGB['green']),
+        'down': COLOR_RGB.get(SETTINGS['DOWN_COLOR'], COLOR_RGB['red']),
+    }
+    depth = color_depth_from_env() if args.color_depth == 'auto' else args.color_depth
+    return AnsiStyles(attrs, colors, depth)
+
+def run_display(stdscr, ansi=False):
+    # stdscr is a curses window, or an AnsiScreen when ansi is set
+    watchlist = load_watchlist(watch_sources)
+
+    # Use command-line argument for crypto color if provided, otherwise use SETTINGS
+    crypto_color = args.crypto_color if args.crypto_color else SETTINGS['CRYPTO_COLOR']
+    if not ansi:
+        init_color_pairs(args.bg_color, crypto_color)
+        curses.curs_set(0)  # Hide the cursor
     stdscr.nodelay(1)   # Make getch() non-blocking
 
-    max_y, max_x = stdscr.getmaxyx()
-    
-    # Create matrix columns based on the background pattern
-    matrix_columns = []
-    x = 0
-    while x < max_x:
-        for gap in SETTINGS['BACKGROUND_PATTERN']:
-            if x < max_x:
-                matrix_columns.append(MatrixColumn(max_y))
-                x += 1
-            x += gap
+    # Recording wraps the screen to capture each frame's changed cells; without it frames go straight to curses
+    recorder = Recorder(args.record) if args.record else None
+    screen = DiffScreen(stdscr) if recorder is not None else stdscr
 
-    crypto_displays = []
+    feed = create_price_feed(watchlist, recorder)
+    max_y, max_x = stdscr.getmaxyx()
+    scene = create_scene(watchlist, feed, max_y, max_x, headless.color_pair if ansi else curses.color_pair)
+    if ansi:
+        stdscr.styles = ansi_styles(scene.attrs, args.bg_color, crypto_color)
+    scheduler = create_scheduler()
 
-    threading.Thread(target=update_prices_periodically, args=(crypto_list, config_filename, 75), daemon=True).start()
+    # Frame timing is only measured while the overlay or the metrics export needs it
+    show_stats = args.stats
+    exporter = MetricsExporter(args.metrics_file, args.metrics_interval) if args.metrics_file else None
+    stats = FrameStats() if show_stats or exporter else None
+    overlay = []
+    next_overlay_update = 0.0
+    watcher = create_config_watcher()
 
     try:
-        last_time = time.time()
         while True:
-            current_time = time.time()
-            dt = current_time - last_time
-            last_time = current_time
-
-            stdscr.erase()
-
-            # Update and draw matrix background
-            x = 0
-            for column in matrix_columns:
-                column.update(dt)
-                for y, (char, intensity, is_lead) in enumerate(column.get_column()):
-                    if char != ' ':  # Don't draw spaces
-                        if is_lead:
-                            attr = curses.color_pair(9) | curses.A_BOLD
-                        else:
-                            fade_length = SETTINGS['FADE_LENGTH']
-                            if fade_length > 0:
-                                if y < fade_length:
-                                    color = curses.color_pair(min(8, 2 + y))
-                                elif y > max_y - fade_length:
-                                    color = curses.color_pair(min(8, 2 + (max_y - y)))
-                                else:
-                                    color = curses.color_pair(1)
-                                attr = color | curses.A_DIM * intensity
-                            else:
-                                attr = curses.color_pair(1) | curses.A_DIM * intensity
-                        safe_addstr(stdscr, y, x, char, attr)
-                x += 1
-                for _ in range(SETTINGS['BACKGROUND_PATTERN'][x % len(SETTINGS['BACKGROUND_PATTERN'])]):
-                    x += 1
-
-            # Update and draw crypto displays
-            for display in crypto_displays[:]:
-                display.update(dt)
-                if display.is_offscreen():
-                    crypto_displays.remove(display)
-                else:
-                    text = display.get_display_text()
-                    for i, char in enumerate(text):
-                        y = display.y + i
-                        if 0 <= y < max_y:
-                            fade_length = SETTINGS['FADE_LENGTH']
-                            if fade_length > 0:
-                                if y < fade_length:
-                                    color = curses.color_pair(min(8, 2 + y))
-                                elif y > max_y - fade_length:
-                                    color = curses.color_pair(min(8, 2 + (max_y - y)))
-                                else:
-                                    color = curses.color_pair(10)
-                                attr = color | curses.A_BOLD
-                            else:
-                                attr = curses.color_pair(10) | curses.A_BOLD
-                            safe_addstr(stdscr, y, display.x, char, attr)
-
-            # Add new crypto display if needed
-            if len(crypto_displays) < SETTINGS['CRYPTO_DISPLAY_COUNT'] and random.random() < SETTINGS['CRYPTO_DISPLAY_CHANCE']:
-                new_crypto = random.choice(crypto_list)
-                new_display = CryptoDisplay(new_crypto, random.randint(0, max_x - 1), max_y)
-                crypto_displays.append(new_display)
-
-            stdscr.refresh()
+            if watcher is not None and watcher.poll():
+                watchlist = reload_watchlist(watchlist, feed, scene)
+            if stats is not None:
+                frame_start = time.perf_counter()
+            steps, dt = scheduler.start_frame()
+            for _ in range(steps):
+                scene.update(dt)
+
+            rendered = scheduler.should_render()
+            cells_written = 0
+            if stats is not None:
+                sim_done = time.perf_counter()
+            if rendered:
+                scene.draw()
+                if show_stats:
+                    if sim_done >= next_overlay_update:
+                        overlay = overlay_lines(collect_metrics(stats, scene, scheduler, feed.provider))
+                        next_overlay_update = sim_done + 0.25
+                    draw_overlay(scene.frame, overlay, scene.attrs.lead)
+                cells_written = scene.render(screen)
+                scheduler.frame_rendered(cells_written)
+                stdscr.refresh()
+                if recorder is not None:
+                    recorder.frame(screen.take_frame())
+                if not feed.started:
+                    # The first frame is up, so start fetching prices
+                    feed.start()
+
+            if stats is not None:
+                stats.record(sim_done - frame_start, time.perf_counter() - sim_done, cells_written, rendered)
+                if exporter is not None and exporter.due():
+                    try:
+                        exporter.write(collect_metrics(stats, scene, scheduler, feed.provider))
+                    except OSError as e:
+                        logger.warning(f"Could not write metrics to {exporter.path}: {e}")
 
             # Check for user input
-            if stdscr.getch() != -1:
+            key = stdscr.getch()
+            if key == ord('s'):
+                show_stats = not show_stats
+                if stats is None:
+                    stats = FrameStats()
+            elif key == curses.KEY_RESIZE:
+                start = time.perf_counter()
+                max_y, max_x = stdscr.getmaxyx()
+                scene.resize(max_y, max_x)
+                logger.info(f"Resized to {max_x}x{max_y} in {(time.perf_counter() - start) * 1000:.1f} ms.")
+            elif key != -1:
                 break
 
-            time.sleep(SETTINGS['ANIMATION_SPEED'])
+            scheduler.wait()
 
     except KeyboardInterrupt:
         logger.info('Graceful shutdown initiated by user.')
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}")
     finally:
-        curses.curs_set(1)  # Show the cursor again
+        logger.info(f"Average cells written per frame: {scene.frame.average_cells_written():.1f}")
+        logger.info(f"Frames rendered: {scheduler.frames_rendered}, skipped: {scheduler.frames_skipped}")
+        if recorder is not None:
+            recorder.close()
+            logger.info(f"Recorded {recorder.frames} frames to {args.record}.")
+        if not ansi:
+            curses.curs_set(1)  # Show the cursor again
         print("\nSuccessfully Closed. You can also use matrix_crypto.py --help to see all options")
 
+def first_frame():
+    # One --startup-benchmark run: the display's startup path up to the first frame, drawn headless
+    watchlist = load_watchlist(watch_sources)
+    feed = create_price_feed(watchlist)
+    width, height = (int(n) for n in args.size.lower().split('x'))
+    scene = create_scene(watchlist, feed, height, width, headless.color_pair)
+    scene.update(0)
+    scene.draw()
+    scene.render(headless.NullScreen(height, width))
+    print(json.dumps({
+        'first_frame_ms': (time.perf_counter() - _import_started) * 1000,
+        'modules': len(sys.modules),
+        'requests_loaded': 'requests' in sys.modules,
+        'numpy_loaded': 'numpy' in sys.modules,
+    }))
+
+def run_startup_benchmark(argv):
+    # Launch fresh interpreters with the same options and time each one up to its first frame
+    import subprocess
+    child_argv = [arg for arg in argv if arg != '--startup-benchmark'] + ['--first-frame']
+    launches = []
+    for _ in range(args.startup_runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, __file__, *child_argv], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result['launch_ms'] = (time.perf_counter() - start) * 1000
+        launches.append(result)
+
+    launch_times = [result['launch_ms'] for result in launches]
+    in_process = [result['first_frame_ms'] for result in launches]
+    print(f"{len(launches)} launches to the first frame: p50 {percentile(launch_times, 0.5):.1f} ms, min {min(launch_times):.1f} ms "
+          f"(in-process p50 {percentile(in_process, 0.5):.1f} ms, {launches[-1]['modules']} modules loaded, "
+          f"requests {'loaded' if launches[-1]['requests_loaded'] else 'not loaded'}, "
+          f"NumPy {'loaded' if launches[-1]['numpy_loaded'] else 'not loaded'})")
+    if args.benchmark_output:
+        with open(args.benchmark_output, 'w') as file:
+            json.dump({'argv': child_argv, 'results': launches}, file, indent=4)
+        print(f"Startup results saved to {args.benchmark_output}")
+
+def main(argv=None):
+    global args, watch_sources
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_parser().parse_args(argv)
+    watch_sources = resolve_watch_sources(args)
+    setup_logging()
+
+    if args.startup_benchmark:
+        run_startup_benchmark(argv)
+    elif args.first_frame:
+        first_frame()
+    elif args.benchmark:
+        run_benchmark()
+    elif args.serve:
+        serve()
+    elif args.connect:
+        curses.wrapper(connect)
+    elif args.replay and args.headless:
+        replay_headless()
+    elif args.replay:
+        curses.wrapper(replay)
+    elif args.output == 'ansi':
+        import ansi_screen
+        ansi_screen.wrapper(run_display, ansi=True)
+    else:
+        curses.wrapper(run_display)
+
 if __name__ == '__main__':
-    curses.wrapper(main)
+    main()
@@ -0,0 +1,130 @@
+import time
+from array import array
+
+from price_cache import write_file_atomic, write_json_atomic
+
+
+class FrameStats:
+    """Rolling frame timings over the last `window` frames.
+
+    Samples go into fixed-size arrays, so recording a frame doesn't allocate.
+    Only created when the overlay or the metrics export is switched on.
+    """
+
+    def __init__(self, window=240, clock=time.perf_counter):
+        self.window = window
+        self.clock = clock
+        self.sim_times = array('d', [0.0]) * window
+        self.draw_times = array('d', [0.0]) * window
+        self.cells = array('l', [0]) * window
+        self.render_times = array('d', [0.0]) * window  # When each rendered frame finished
+        self.count = 0
+        self.rendered = 0
+
+    def record(self, sim_time, draw_time, cells_written, rendered):
+        i = self.count % self.window
+        self.sim_times[i] = sim_time
+        self.draw_times[i] = draw_time
+        self.cells[i] = cells_written
+        self.count += 1
+        if rendered:
+            self.render_times[self.rendered % self.window] = self.clock()
+            self.rendered += 1
+
+    def _samples(self, values, count):
+        return values[:min(count, self.window)]
+
+    def summary(self):
+        frames = sorted(a + b for a, b in zip(self._samples(self.sim_times, self.count),
+                                              self._samples(self.draw_times, self.count)))
+        n = len(frames)
+        rendered = self._samples(self.render_times, self.rendered)
+        span = max(rendered) - min(rendered) if len(rendered) > 1 else 0.0
+        return {
+            'fps': (len(rendered) - 1) / span if span else 0.0,
+            'frame_ms_p50': frames[n // 2] * 1000 if n else 0.0,
+            'frame_ms_p99': frames[min(n - 1, int(0.99 * n))] * 1000 if n else 0.0,
+            'sim_ms': sum(self._samples(self.sim_times, self.count)) / n * 1000 if n else 0.0,
+            'draw_ms': sum(self._samples(self.draw_times, self.count)) / n * 1000 if n else 0.0,
+            'cells_per_frame': sum(self._samples(self.cells, self.count)) / n if n else 0.0,
+        }
+
+
+def collect_metrics(stats, scene, scheduler, provider=None):
+    metrics = stats.summary()
+    metrics.update({
+        'columns': len(scene.background.xs),
+        'tickers': len(scene.crypto_displays),
+        'frames_rendered_total': scheduler.frames_rendered,
+        'frames_skipped_total': scheduler.frames_skipped,
+    })
+    snapshot = scene.snapshot()
+    if snapshot is not None:
+        metrics['price_version'] = snapshot.version
+        metrics['price_age_seconds'] = time.time() - snapshot.timestamp if snapshot.version else None
+    if provider is not None:
+        provider_stats = provider.stats()
+        latency = provider_stats.get('latency', {})
+        metrics['fetch_calls_total'] = provider_stats.get('calls', 0)
+        metrics['fetch_latency_ms'] = latency.get('last_ms')
+        metrics['fetch_errors_total'] = dict(provider_stats.get('errors', {}))
+        if 'ticks' in provider_stats:
+            metrics['price_ticks_total'] = provider_stats['ticks']
+        if 'worker_restarts' in provider_stats:
+            metrics['price_worker_restarts_total'] = provider_stats['worker_restarts']
+    return metrics
+
+
+def overlay_lines(metrics):
+    age = metrics.get('price_age_seconds')
+    latency = metrics.get('fetch_latency_ms')
+    errors = metrics.get('fetch_errors_total') or {}
+    return [
+        f"FPS {metrics['fps']:5.1f}  frame p50 {metrics['frame_ms_p50']:.2f}ms p99 {metrics['frame_ms_p99']:.2f}ms",
+        f"sim {metrics['sim_ms']:.2f}ms  draw {metrics['draw_ms']:.2f}ms  cells/frame {metrics['cells_per_frame']:.0f}",
+        f"columns {metrics['columns']}  tickers {metrics['tickers']}  skipped {metrics['frames_skipped_total']}",
+        f"prices v{metrics.get('price_version', '-')} age {'-' if age is None else f'{age:.0f}s'}"
+        f"  fetch {'-' if latency is None else f'{latency:.0f}ms'}  errors {sum(errors.values())}",
+    ]
+
+
+def draw_overlay(frame, lines, attr):
+    # Text panel in the top-left corner, drawn over the scene
+    width = max(len(line) for line in lines) + 2
+    for y, line in enumerate(lines):
+        text = f" {line}".ljust(width)
+        for x, char in enumerate(text[:frame.width]):
+            frame.put(y, x, char, attr)
+
+
+def prometheus_text(metrics, prefix='matrix_crypto'):
+    lines = []
+    for name, value in sorted(metrics.items()):
+        metric_type = 'counter' if name.endswith('_total') else 'gauge'
+        if isinstance(value, dict):
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            for label, count in sorted(value.items()):
+                lines.append(f'{prefix}_{name}{{kind="{label}"}} {count}')
+        elif value is not None:
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            lines.append(f"{prefix}_{name} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    # Periodically writes metrics to a Prometheus textfile (.prom) or a JSON file
+    def __init__(self, path, interval=15.0, clock=time.monotonic):
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self.next_write = clock()
+
+    def due(self):
+        return self.clock() >= self.next_write
+
+    def write(self, metrics):
+        self.next_write = self.clock() + self.interval
+        if self.path.endswith('.prom'):
+            write_file_atomic(self.path, prometheus_text(metrics))
+        else:
+            write_json_atomic(self.path, dict(metrics, timestamp=time.time()), indent=4)
@@ -0,0 +1,131 @@
+import numpy as np
+
+
+class NumpyBackground:
+    """Whole matrix background simulated as 2D NumPy arrays.
+
+    Mirrors the per-column MatrixColumn model: every column has a ring buffer
+    of glyph indices and intensities (one row per column), a head offset, and
+    its own top/length/speed/counter. update() advances every column in one
+    batched step, with vectorized masks for falling, character mutation and
+    column resets.
+    """
+
+    def __init__(self, column_xs, height, settings, seed=None):
+        self.settings = settings
+        self.rng = np.random.default_rng(seed)
+        self.glyph_table = tuple(settings['BACKGROUND_CHARS'])
+        self.xs = np.asarray(column_xs, dtype=np.int32)
+        self.height = height
+        count = len(self.xs)
+        size = max(height, 1)
+        self.glyphs = np.zeros((count, size), dtype=np.uint16)
+        self.intensities = np.ones((count, size), dtype=np.uint8)
+        self.head = np.zeros(count, dtype=np.int64)
+        self.length, self.speed = self._random_columns(count, height)
+        self.counter = np.zeros(count)
+        self.top = -self.length  # Start above the screen
+        self._initialize_columns(np.arange(count))
+
+    def _random_columns(self, count, height):
+        length = (self.rng.uniform(*self.settings['BACKGROUND_COLUMN_LENGTH_RANGE'], count) * height).astype(np.int64)
+        speed = self.rng.uniform(*self.settings['BACKGROUND_FALL_SPEED_RANGE'], count)
+        return length, speed
+
+    def _random_cells(self, shape):
+        glyphs = self.rng.integers(0, len(self.glyph_table), shape, dtype=np.uint16)
+        intensities = self.rng.integers(1, self.settings['BACKGROUND_INTENSITY_LEVELS'] + 1, shape, dtype=np.uint8)
+        return glyphs, intensities
+
+    def _initialize_columns(self, rows):
+        # Cells past a column's length are never visible, so refill the whole row
+        self.head[rows] = 0
+        self.glyphs[rows], self.intensities[rows] = self._random_cells((len(rows), self.glyphs.shape[1]))
+
+    def update(self, dt):
+        self.counter += dt
+        ticking = self.counter >= self.speed
+        if not ticking.any():
+            return
+        self.counter[ticking] = 0
+        self.top[ticking] += 1
+        size = self.glyphs.shape[1]
+
+        # Shift characters down and add a new character at the top
+        shifting = np.flatnonzero(ticking & (self.top >= 0))
+        if len(shifting):
+            self.head[shifting] = (self.head[shifting] - 1) % size
+            heads = self.head[shifting]
+            self.glyphs[shifting, heads], self.intensities[shifting, heads] = self._random_cells(len(shifting))
+
+        # Randomly change some characters
+        rows = np.flatnonzero(ticking)
+        k = np.arange(size)
+        change = self.rng.random((len(rows), size)) < self.settings['BACKGROUND_CHANGE_CHANCE']
+        change &= k < np.minimum(self.length[rows], self.height)[:, None]
+        row_idx, k_idx = np.nonzero(change)
+        if len(row_idx):
+            cols = rows[row_idx]
+            phys = (self.head[cols] + k_idx) % size
+            self.glyphs[cols, phys], self.intensities[cols, phys] = self._random_cells(len(cols))
+
+        # Reset columns that are fully off-screen
+        reset = np.flatnonzero(ticking & (self.top >= self.height))
+        if len(reset):
+            self.top[reset] = -self.length[reset]
+            self._initialize_columns(reset)
+
+    def resize(self, column_xs, height):
+        # Keep existing columns' cells, relative position and length; columns only come and go at the right edge
+        count = len(column_xs)
+        kept = min(count, len(self.xs))
+        old_height = self.height
+        old_size = self.glyphs.shape[1]
+        size = max(height, 1)
+
+        # Unroll every ring so logical cell k is at index k, then truncate or pad to the new height
+        k = (self.head[:kept, None] + np.arange(min(old_size, size))) % old_size
+        rows = np.arange(kept)[:, None]
+        glyphs, intensities = self._random_cells((count, size))
+        glyphs[:kept, :k.shape[1]] = self.glyphs[rows, k]
+        intensities[:kept, :k.shape[1]] = self.intensities[rows, k]
+        self.glyphs, self.intensities = glyphs, intensities
+
+        length, speed = self._random_columns(count, height)
+        top = -length
+        if old_height:
+            length[:kept] = self.length[:kept] * height // old_height
+            top[:kept] = self.top[:kept] * height // old_height
+        speed[:kept] = self.speed[:kept]
+        counter = np.zeros(count)
+        counter[:kept] = self.counter[:kept]
+
+        self.xs = np.asarray(column_xs, dtype=np.int32)
+        self.height = height
+        self.head = np.zeros(count, dtype=np.int64)
+        self.length, self.speed, self.counter, self.top = length, speed, counter, top
+
+    def draw(self, frame, attrs):
+        height = self.height
+        size = self.glyphs.shape[1]
+        start = np.maximum(self.top, 0)
+        stop = np.minimum(self.top + self.length, height)
+        y = np.arange(height)
+        visible = (y >= start[:, None]) & (y < stop[:, None])
+        cols, ys = np.nonzero(visible)
+        if not len(cols):
+            return
+        phys = (self.head[cols] + ys - self.top[cols]) % size
+        glyphs = self.glyphs[cols, phys]
+        intensities = self.intensities[cols, phys]
+        # Lead character is at the bottom, but not if it's at the very bottom of the screen
+        stops = stop[cols]
+        leads = (ys == stops - 1) & (stops < height)
+        glyph_table = self.glyph_table
+        background, lead = attrs.background, attrs.lead
+        put = frame.put
+        for x, row, glyph, intensity, is_lead in zip(self.xs[cols].tolist(), ys.tolist(), glyphs.tolist(),
+                                                     intensities.tolist(), leads.tolist()):
+            char = glyph_table[glyph]
+            if char != ' ':  # Don't draw spaces
+                put(row, x, char, lead if is_lead else background[row][intensity])
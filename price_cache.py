@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+from collections import namedtuple
+
+CACHE_FORMAT_VERSION = 1
+
+CachedPrices = namedtuple('CachedPrices', ['timestamp', 'prices'])
+
+
+def cache_path_for(config_filename):
+    # The cache sits next to the crypto list it belongs to
+    return os.path.splitext(config_filename)[0] + '.prices-cache.json'
+
+
+def load_price_cache(path):
+    # Returns CachedPrices, or None if the cache is missing, unreadable or in an unknown format
+    try:
+        with open(path, 'r') as file:
+            data = json.load(file)
+        if data.get('format') != CACHE_FORMAT_VERSION:
+            return None
+        prices = {coin_id: price for coin_id, price in data['prices'].items() if isinstance(price, (int, float))}
+        return CachedPrices(float(data['timestamp']), prices)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def write_file_atomic(path, data):
+    # Write to a temporary file in the same directory and rename it over the target,
+    # so concurrent readers and writers never see or leave behind a half-written file.
+    # data is str or bytes.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(data, bytes) else 'w') as file:
+            file.write(data)
+        os.chmod(temp_path, 0o644)  # mkstemp creates the file private to this user
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path, data, **dump_options):
+    write_file_atomic(path, json.dumps(data, **dump_options))
+
+
+def save_price_cache(path, snapshot):
+    data = {'format': CACHE_FORMAT_VERSION, 'timestamp': snapshot.timestamp, 'prices': dict(snapshot.prices)}
+    write_json_atomic(path, data, separators=(',', ':'))
@@ -0,0 +1,240 @@
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+
+
+class PriceFetchError(Exception):
+    pass
+
+
+class LatencyHistogram:
+    # Upper bounds of the latency buckets in milliseconds; the last bucket is open-ended
+    BOUNDS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BOUNDS_MS)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.last_ms = None
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        for i, bound in enumerate(self.BOUNDS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum_ms += ms
+        self.last_ms = ms
+
+    def as_dict(self):
+        return {
+            'buckets_ms': {('+Inf' if bound == float('inf') else str(bound)): count for bound, count in zip(self.BOUNDS_MS, self.counts)},
+            'count': self.total,
+            'mean_ms': self.sum_ms / self.total if self.total else 0.0,
+            'last_ms': self.last_ms,
+        }
+
+
+class CoinGeckoClient:
+    """CoinGecko API client on a pooled keep-alive session.
+
+    Caps the number of calls per minute, retries 429s, 5xx responses and
+    connection errors with exponential backoff and full jitter (honouring
+    Retry-After when the server sends it), and records a latency histogram and
+    error counts. base_url can point at a local stub server for testing.
+    requests is only imported when the first call is made, so creating a
+    client doesn't load the network stack.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url=COINGECKO_API_URL, max_calls_per_minute=10, timeout=20, max_retries=3,
+                 backoff_base=2.0, backoff_max=120.0, pool_size=4, chunk_size=250, max_workers=4, session=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.base_url = base_url.rstrip('/')
+        self.max_calls_per_minute = max_calls_per_minute
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.clock = clock
+        self.sleep = sleep
+        self._executor = None
+        self.pool_size = pool_size
+        self.session = session  # Created on first use when not given
+
+        self.latency = LatencyHistogram()
+        self.errors = Counter()
+        self.calls = 0
+        self.cooldown_until = 0.0  # Set from Retry-After or backoff; no calls are made before it
+        self._call_times = deque()
+        self._lock = threading.Lock()
+
+    def _wait_for_slot(self):
+        # Block until a call fits in the per-minute budget and any cooldown has passed
+        while True:
+            with self._lock:
+                now = self.clock()
+                while self._call_times and now - self._call_times[0] >= 60:
+                    self._call_times.popleft()
+                wait = self.cooldown_until - now
+                if self.max_calls_per_minute and len(self._call_times) >= self.max_calls_per_minute:
+                    wait = max(wait, 60 - (now - self._call_times[0]))
+                if wait <= 0:
+                    self._call_times.append(now)
+                    self.calls += 1
+                    return
+            self.sleep(wait)
+
+    def _count_error(self, kind):
+        with self._lock:
+            self.errors[kind] += 1
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _set_cooldown(self, delay):
+        with self._lock:
+            self.cooldown_until = max(self.cooldown_until, self.clock() + delay)
+
+    def _get_session(self):
+        with self._lock:
+            if self.session is None:
+                self.session = create_session(self.pool_size)
+            return self.session
+
+    def get(self, path, params=None):
+        import requests
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot()
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                response = session.get(url, params=params, timeout=self.timeout)
+            except requests.Timeout as e:
+                self._count_error('timeout')
+                error = PriceFetchError(f"Request to {url} timed out: {e}")
+            except requests.RequestException as e:
+                self._count_error('connection')
+                error = PriceFetchError(f"Request to {url} failed: {e}")
+            else:
+                with self._lock:
+                    self.latency.record(time.perf_counter() - start)
+                if response.status_code == 200:
+                    try:
+                        return response.json()
+                    except ValueError as e:
+                        self._count_error('decode')
+                        raise PriceFetchError(f"Invalid JSON from {url}: {e}")
+                self._count_error(f"http_{response.status_code}")
+                error = PriceFetchError(f"HTTP {response.status_code} from {url}")
+                if response.status_code not in self.RETRY_STATUSES:
+                    raise error
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            if attempt == self.max_retries:
+                if retry_after is not None:
+                    self._set_cooldown(retry_after)
+                raise error
+            self._set_cooldown(self._backoff_delay(attempt, retry_after))
+
+    def get_prices(self, ids, vs_currency='usd'):
+        data = self.get('simple/price', {'ids': ','.join(ids), 'vs_currencies': vs_currency})
+        if not isinstance(data, dict):
+            self._count_error('decode')
+            raise PriceFetchError(f"Unexpected price response: {str(data)[:200]}")
+        prices = {}
+        for coin_id, quote in data.items():
+            if isinstance(quote, dict) and isinstance(quote.get(vs_currency), (int, float)):
+                prices[coin_id] = quote[vs_currency]
+        return prices
+
+    def get_prices_chunked(self, ids, vs_currency='usd'):
+        """Fetch prices for any number of ids in bounded chunks, a few at a time.
+
+        Returns (prices, failed_ids): prices merged from every chunk that
+        succeeded, and the ids of the chunks that did not.
+        """
+        chunks = chunk_ids(ids, self.chunk_size)
+        if len(chunks) <= 1 or self.max_workers <= 1:
+            results = [self._fetch_chunk(chunk, vs_currency) for chunk in chunks]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='price-fetch')
+            results = list(self._executor.map(lambda chunk: self._fetch_chunk(chunk, vs_currency), chunks))
+
+        prices = {}
+        failed_ids = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, PriceFetchError):
+                failed_ids.extend(chunk)
+            else:
+                prices.update(result)
+        if failed_ids and not prices:
+            raise PriceFetchError(f"All {len(chunks)} price requests failed, last error: {results[-1]}")
+        return prices, failed_ids
+
+    def _fetch_chunk(self, chunk, vs_currency):
+        try:
+            return self.get_prices(chunk, vs_currency)
+        except PriceFetchError as e:
+            return e
+
+    def seconds_until_ready(self):
+        return max(0.0, self.cooldown_until - self.clock())
+
+    def stats(self):
+        return {'calls': self.calls, 'errors': dict(self.errors), 'latency': self.latency.as_dict()}
+
+
+def create_session(pool_size=4):
+    # Keep-alive session with a connection pool sized for the parallel chunk requests
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def chunk_ids(ids, max_ids=250, max_chars=2000):
+    # Split ids (deduplicated, order kept) into chunks bounded by count and by ids= query length
+    chunks = []
+    chunk = []
+    length = 0
+    for coin_id in dict.fromkeys(ids):
+        if chunk and (len(chunk) >= max_ids or length + len(coin_id) + 1 > max_chars):
+            chunks.append(chunk)
+            chunk = []
+            length = 0
+        chunk.append(coin_id)
+        length += len(coin_id) + 1
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def parse_retry_after(value):
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
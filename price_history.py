@@ -0,0 +1,202 @@
+import gzip
+import json
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+
+from price_cache import write_file_atomic
+
+HISTORY_FORMAT_VERSION = 1
+
+# (seconds per bucket, buckets kept) per tier, finest first: 2 hours by the minute,
+# 25 hours by the quarter hour and a week by the hour
+TIERS = ((60, 120), (900, 100), (3600, 168))
+
+CHANGE_WINDOWS = {'poll': None, '1h': 3600, '24h': 86400}
+
+
+def history_path_for(config_filename):
+    # Kept next to the crypto list, like the price cache
+    return os.path.splitext(config_filename)[0] + '.price-history.bin'
+
+
+class PriceHistory:
+    """Price time series for every coin, in fixed-size typed ring buffers.
+
+    Each tier keeps one float32 per coin per bucket, holding the last price
+    seen in that bucket, so coarser tiers are downsampled versions of the
+    finer ones. All coins of a tier share one flat array: coin i owns the
+    slots [i * capacity, (i + 1) * capacity) and bucket b is stored at slot
+    b % capacity. Empty buckets are NaN. With the default tiers a coin costs
+    about 1.6 KB, so thousands of coins fit in a few MB.
+
+    record() is called by the price thread and the lookups by the render
+    thread. A new coin's slots are all added before its id goes into the
+    index, so lookups never see a coin whose slots don't exist yet.
+    """
+
+    def __init__(self, tiers=TIERS):
+        self.tiers = tuple(tuple(tier) for tier in tiers)
+        self.index = {}  # Coin id -> coin number
+        self.values = [array('f') for _ in self.tiers]
+        self.last_buckets = [array('q') for _ in self.tiers]  # Newest bucket written, per coin
+        self.latest = array('d')  # Most recent price and the one before it, per coin
+        self.previous = array('d')
+        self.last_time = array('d')
+
+    def __len__(self):
+        return len(self.index)
+
+    def _coin(self, coin_id):
+        i = self.index.get(coin_id)
+        if i is None:
+            i = len(self.index)
+            for (_, capacity), values, last_buckets in zip(self.tiers, self.values, self.last_buckets):
+                values.extend(array('f', [math.nan]) * capacity)
+                last_buckets.append(0)
+            self.latest.append(math.nan)
+            self.previous.append(math.nan)
+            self.last_time.append(0.0)
+            self.index[coin_id] = i  # Last: readers look coins up through the index
+        return i
+
+    def record(self, prices, timestamp):
+        for coin_id, price in prices.items():
+            i = self._coin(coin_id)
+            if timestamp <= self.last_time[i]:
+                continue  # Older than what we have, e.g. a cached snapshot published at startup
+            self.previous[i] = self.latest[i]
+            self.latest[i] = price
+            self.last_time[i] = timestamp
+            for (resolution, capacity), values, last_buckets in zip(self.tiers, self.values, self.last_buckets):
+                bucket = int(timestamp // resolution)
+                base = i * capacity
+                if last_buckets[i]:
+                    # Clear the buckets skipped since the last sample, at most one full ring (a new coin's are all empty)
+                    for skipped in range(max(last_buckets[i] + 1, bucket - capacity + 1), bucket):
+                        values[base + skipped % capacity] = math.nan
+                last_buckets[i] = bucket
+                values[base + bucket % capacity] = price
+
+    def price_at(self, coin_id, timestamp):
+        # The last price recorded at or before timestamp, from the finest tier that still covers it
+        i = self.index.get(coin_id)
+        if i is None:
+            return None
+        for (resolution, capacity), values, last_buckets in zip(self.tiers, self.values, self.last_buckets):
+            last = last_buckets[i]
+            bucket = min(int(timestamp // resolution), last)
+            if bucket <= last - capacity:
+                continue  # Older than this tier reaches back
+            base = i * capacity
+            for b in range(bucket, last - capacity, -1):
+                value = values[base + b % capacity]
+                if not math.isnan(value):
+                    return value
+        return None
+
+    def change(self, coin_id, seconds=None):
+        # Percent change of the latest price over the last `seconds`, or since the previous poll when None
+        i = self.index.get(coin_id)
+        if i is None:
+            return None
+        past = self.previous[i] if seconds is None else self.price_at(coin_id, self.last_time[i] - seconds)
+        if past is None or math.isnan(past) or past == 0:
+            return None  # Nothing old enough to compare with yet
+        return (self.latest[i] - past) / past * 100
+
+    def nbytes(self):
+        arrays = [*self.values, *self.last_buckets, self.latest, self.previous, self.last_time]
+        return sum(len(a) * a.itemsize for a in arrays)
+
+    def dump(self):
+        # JSON header line, then the raw arrays in a fixed order; saved gzip-compressed (empty buckets compress away).
+        # Only a copy, so it is cheap, but it must run in the thread that records for the arrays to agree
+        header = {'format': HISTORY_FORMAT_VERSION, 'byteorder': sys.byteorder, 'tiers': self.tiers,
+                  'ids': sorted(self.index, key=self.index.get)}
+        parts = [json.dumps(header, separators=(',', ':')).encode() + b'\n']
+        for values, last_buckets in zip(self.values, self.last_buckets):
+            parts += [last_buckets.tobytes(), values.tobytes()]
+        parts += [self.latest.tobytes(), self.previous.tobytes(), self.last_time.tobytes()]
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        # Reads a gzip-compressed dump()
+        data = gzip.decompress(data)
+        line, _, body = data.partition(b'\n')
+        header = json.loads(line)
+        if header.get('format') != HISTORY_FORMAT_VERSION:
+            raise ValueError(f"Unknown price history format {header.get('format')}")
+        history = cls(header['tiers'])
+        count = len(header['ids'])
+        history.index = {coin_id: i for i, coin_id in enumerate(header['ids'])}
+        offset = 0
+
+        def take(typecode, length):
+            nonlocal offset
+            values = array(typecode)
+            size = values.itemsize * length
+            values.frombytes(body[offset:offset + size])
+            if len(values) != length:
+                raise ValueError("Truncated price history")
+            if header['byteorder'] != sys.byteorder:
+                values.byteswap()
+            offset += size
+            return values
+
+        history.values, history.last_buckets = [], []
+        for _, capacity in history.tiers:
+            history.last_buckets.append(take('q', count))
+            history.values.append(take('f', count * capacity))
+        history.latest, history.previous, history.last_time = take('d', count), take('d', count), take('d', count)
+        return history
+
+
+def load_price_history(path):
+    # Returns the saved PriceHistory, or None if it is missing, unreadable or in an unknown format
+    try:
+        with open(path, 'rb') as file:
+            return PriceHistory.from_bytes(file.read())
+    except (OSError, EOFError, ValueError, KeyError, TypeError):
+        return None
+
+
+class HistorySaver:
+    """Saves a PriceHistory to disk, at most every `interval` seconds.
+
+    Called like a price recorder, with (snapshot, prices), after each
+    publish and from the thread that records into the history, so the
+    arrays are copied there in one consistent piece. Compressing and
+    writing happen in a background thread, so a push feed isn't held up.
+    on_error(exception) is called when a write fails.
+    """
+
+    def __init__(self, path, history, interval=30.0, on_error=None, clock=time.monotonic):
+        self.path = path
+        self.history = history
+        self.interval = interval
+        self.on_error = on_error
+        self.clock = clock
+        self._next_save = float('-inf')  # The first publish is saved right away
+        self._saving = False
+
+    def __call__(self, snapshot=None, prices=None):
+        now = self.clock()
+        if self._saving or now < self._next_save:
+            return
+        self._next_save = now + self.interval
+        self._saving = True
+        threading.Thread(target=self._write, args=(self.history.dump(),), name='price-history-saver', daemon=True).start()
+
+    def _write(self, data):
+        try:
+            write_file_atomic(self.path, gzip.compress(data, compresslevel=1))
+        except OSError as e:
+            if self.on_error is not None:
+                self.on_error(e)
+        finally:
+            self._saving = False
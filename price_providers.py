@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from price_client import PriceFetchError
+from recording import is_recording, read_prices
+
+
+def format_price(price):
+    return "{:.2f}".format(price) if price < 1000 else "{:,.0f}".format(price)
+
+
+# Immutable price snapshot. prices maps coin id to the numeric USD price and
+# formatted maps coin id to its display text; both are read-only views.
+PriceSnapshot = namedtuple('PriceSnapshot', ['version', 'timestamp', 'prices', 'formatted'])
+
+EMPTY_SNAPSHOT = PriceSnapshot(0, 0.0, MappingProxyType({}), MappingProxyType({}))
+
+
+class PriceBoard:
+    """Holds the current PriceSnapshot.
+
+    The price thread builds each new snapshot off to the side and publishes it
+    with a single reference swap, so the render loop can read board.snapshot
+    once per frame without locks and never sees a half-applied update.
+    With a PriceHistory attached, updates are recorded into it before the
+    snapshot is swapped in, so a new snapshot version always comes with
+    up-to-date history.
+    """
+
+    def __init__(self, formatter=format_price, history=None):
+        self.formatter = formatter
+        self.history = history
+        self.snapshot = EMPTY_SNAPSHOT
+        self._publish_lock = threading.Lock()  # Serializes writers only; readers never take it
+
+    def publish(self, prices, timestamp=None):
+        # Merge onto the previous snapshot so coins missing from this update keep their last good price
+        with self._publish_lock:
+            previous = self.snapshot
+            merged = dict(previous.prices)
+            merged.update(prices)
+            formatted = dict(previous.formatted)
+            for coin_id, price in prices.items():
+                formatted[coin_id] = self.formatter(price)
+            timestamp = timestamp if timestamp is not None else time.time()
+            if self.history is not None:
+                self.history.record(prices, timestamp)
+            snapshot = PriceSnapshot(previous.version + 1, timestamp, MappingProxyType(merged), MappingProxyType(formatted))
+            self.snapshot = snapshot
+            return snapshot
+
+
+class PriceProvider:
+    """Source of prices for the display.
+
+    Prices are either polled, see PolledProvider, or pushed: push providers
+    publish to the board themselves from start(board, requests, recorders).
+    stats() is what the overlay and metrics show.
+    """
+
+    name = 'provider'
+    shows_prices = True
+    cacheable = False  # Whether snapshots are worth keeping in the on-disk price cache
+    push = False
+
+    def stats(self):
+        return {}
+
+
+class PolledProvider(PriceProvider):
+    """Provider whose prices are fetched in a loop by update_prices_periodically().
+
+    fetch(ids) returns (prices, failed_ids) where prices maps coin id to a
+    numeric USD price, and raises PriceFetchError when nothing could be
+    fetched. next_delay() is the number of seconds to wait before the next
+    fetch, or None when the provider has nothing more to give.
+    """
+
+    def fetch(self, ids):
+        raise NotImplementedError
+
+    def next_delay(self):
+        return None
+
+
+class CoinGeckoProvider(PolledProvider):
+    name = 'coingecko'
+    cacheable = True
+
+    def __init__(self, client, interval=75):
+        self.client = client
+        self.interval = interval
+
+    def fetch(self, ids):
+        return self.client.get_prices_chunked(ids)
+
+    def next_delay(self):
+        # Jitter the interval so displays sharing an IP drift apart, and wait out any rate-limit cooldown
+        return max(self.interval * random.uniform(0.9, 1.1), self.client.seconds_until_ready())
+
+    def stats(self):
+        return self.client.stats()
+
+
+class FileProvider(PolledProvider):
+    """Prices read from a local JSON or CSV file, re-read whenever it changes.
+
+    JSON is either {"bitcoin": 65000.0} or the CoinGecko shape
+    {"bitcoin": {"usd": 65000.0}}. CSV rows are "id,price", with an optional
+    header row.
+    """
+
+    name = 'file'
+
+    def __init__(self, path, interval=5):
+        self.path = path
+        self.interval = interval
+        self._mtime = None
+        self._prices = {}
+
+    def _load(self):
+        if self.path.lower().endswith('.csv'):
+            prices = {}
+            with open(self.path, newline='') as file:
+                for row in csv.reader(file):
+                    if len(row) < 2:
+                        continue
+                    try:
+                        prices[row[0].strip()] = float(row[1])
+                    except ValueError:
+                        continue  # Header or malformed row
+            return prices
+        with open(self.path, 'r') as file:
+            data = json.load(file)
+        prices = {}
+        for coin_id, value in data.items():
+            if isinstance(value, dict):
+                value = value.get('usd')
+            if isinstance(value, (int, float)):
+                prices[coin_id] = value
+        return prices
+
+    def fetch(self, ids):
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime != self._mtime:
+                self._prices = self._load()
+                self._mtime = mtime
+        except (OSError, ValueError) as e:
+            raise PriceFetchError(f"Could not read prices from {self.path}: {e}")
+        prices = {coin_id: self._prices[coin_id] for coin_id in ids if coin_id in self._prices}
+        return prices, [coin_id for coin_id in ids if coin_id not in prices]
+
+    def next_delay(self):
+        return self.interval
+
+
+class ReplayProvider(PolledProvider):
+    """Replays price snapshots recorded with record_snapshot(), keeping their original spacing.
+
+    Also plays the price updates of a frame recording made with --record.
+    speed scales the time between snapshots; the recording loops when it runs out.
+    """
+
+    name = 'replay'
+
+    def __init__(self, path, speed=1.0, loop=True):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        if is_recording(path):
+            self.records = read_prices(path)
+        else:
+            self.records = []
+            with open(path, 'r') as file:
+                for line in file:
+                    line = line.strip()
+                    if line:
+                        record = json.loads(line)
+                        self.records.append((record['time'], record['prices']))
+        if not self.records:
+            raise ValueError(f"No price snapshots recorded in {path}")
+        self.position = 0
+
+    def fetch(self, ids):
+        _, recorded = self.records[self.position]
+        prices = {coin_id: recorded[coin_id] for coin_id in ids if coin_id in recorded}
+        return prices, [coin_id for coin_id in ids if coin_id not in prices]
+
+    def next_delay(self):
+        current_time = self.records[self.position][0]
+        self.position += 1
+        if self.position >= len(self.records):
+            if not self.loop or len(self.records) == 1:
+                return None
+            # Wrap around after the average gap between snapshots
+            self.position = 0
+            return (self.records[-1][0] - self.records[0][0]) / (len(self.records) - 1) / self.speed
+        return max(0.0, (self.records[self.position][0] - current_time) / self.speed)
+
+
+class NoPriceProvider(PolledProvider):
+    # Names-only display: tickers are shown without prices and nothing is fetched
+    name = 'none'
+    shows_prices = False
+
+    def fetch(self, ids):
+        return {}, []
+
+
+def record_snapshot(path, snapshot, prices):
+    # Append the prices from one update as a JSON line that ReplayProvider can play back
+    with open(path, 'a') as file:
+        file.write(json.dumps({'version': snapshot.version, 'time': snapshot.timestamp, 'prices': prices}) + '\n')
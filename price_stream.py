@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+import time
+
+from broadcast import parse_address
+from price_client import LatencyHistogram
+from price_providers import PriceProvider
+
+# A push feed is line-delimited JSON over TCP or a Unix socket. Each line is a
+# tick, {"id": "bitcoin", "price": 65000.5}, or a batch of them as a mapping,
+# {"bitcoin": 65000.5, "ethereum": 3200.1} (CoinGecko's {"usd": ...} shape also works).
+
+
+def parse_ticks(line):
+    # Returns {coin id: price} for one line; raises ValueError for anything else
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("A tick line must be a JSON object")
+    if 'id' in data:
+        price = data.get('price')
+        if not isinstance(data['id'], str) or not isinstance(price, (int, float)):
+            raise ValueError("A tick needs a string id and a numeric price")
+        return {data['id']: price}
+    ticks = {}
+    for coin_id, price in data.items():
+        if isinstance(price, dict):
+            price = price.get('usd')
+        if isinstance(price, (int, float)):
+            ticks[coin_id] = price
+    return ticks
+
+
+class StreamProvider(PriceProvider):
+    """Prices pushed by a feed, applied as they arrive instead of polled.
+
+    start() runs an asyncio loop in a background thread that reads ticks,
+    keeps those for coins in the watchlist and coalesces bursts: a tick that
+    follows a quiet spell is published right away, later ones are merged and
+    published together one frame interval after the previous publish. So
+    the board gets at most one snapshot per frame and every tick reaches it
+    within one frame. Lost connections are retried with backoff.
+    """
+
+    name = 'stream'
+    push = True
+
+    def __init__(self, address, interval=1 / 60, min_backoff=0.5, max_backoff=30.0, line_limit=1 << 20,
+                 clock=time.monotonic):
+        self.address = address
+        self.line_limit = line_limit  # Longest line accepted; batches for big watchlists are long
+        self.interval = interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.connected = False
+        self.ticks = 0
+        self.publishes = 0
+        self.errors = {}
+        self.latency = LatencyHistogram()  # From a tick's arrival to its publish
+        self._pending = {}
+        self._pending_since = None
+        self._flush_handle = None
+        self._last_publish = float('-inf')
+
+    def stats(self):
+        return {'calls': self.publishes, 'ticks': self.ticks, 'connected': self.connected,
+                'errors': dict(self.errors), 'latency': self.latency.as_dict()}
+
+    def _count_error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def start(self, board, requests, recorders=()):
+        # requests is the PriceRequests of the feed; its ids can change while the stream runs
+        thread = threading.Thread(target=asyncio.run, args=(self.run(board, requests, recorders),),
+                                  name='price-stream', daemon=True)
+        thread.start()
+        return thread
+
+    async def run(self, board, requests, recorders=()):
+        backoff = self.min_backoff
+        while True:
+            try:
+                host, port = parse_address(self.address)
+                if port is None:
+                    reader, writer = await asyncio.open_unix_connection(host, limit=self.line_limit)
+                else:
+                    reader, writer = await asyncio.open_connection(host, port, limit=self.line_limit)
+            except OSError:
+                self._count_error('connect')
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            self.connected = True
+            backoff = self.min_backoff
+            try:
+                await self._read_ticks(reader, board, requests, recorders)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                self.connected = False
+                writer.close()
+            self._count_error('disconnect')
+            await asyncio.sleep(backoff)
+
+    async def _read_ticks(self, reader, board, requests, recorders):
+        loop = asyncio.get_running_loop()
+        ids, wanted = None, set()
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                self._count_error('decode')  # Longer than line_limit; the rest of it has been dropped
+                continue
+            if not line:
+                return
+            if requests.ids is not ids:
+                ids = requests.ids  # The watchlist was reloaded
+                wanted = set(ids)
+            try:
+                ticks = parse_ticks(line)
+            except ValueError:
+                self._count_error('decode')
+                continue
+            self.ticks += len(ticks)
+            ticks = {coin_id: price for coin_id, price in ticks.items() if coin_id in wanted}
+            if not ticks:
+                continue
+            if not self._pending:
+                self._pending_since = self.clock()
+            self._pending.update(ticks)
+            if self._flush_handle is None:
+                delay = max(0.0, self._last_publish + self.interval - self.clock())
+                self._flush_handle = loop.call_later(delay, self._flush, board, recorders)
+
+    def _flush(self, board, recorders):
+        self._flush_handle = None
+        prices, self._pending = self._pending, {}
+        now = self.clock()
+        self._last_publish = now
+        snapshot = board.publish(prices)
+        self.publishes += 1
+        self.latency.record(now - self._pending_since)
+        for record in recorders:
+            record(snapshot, prices)
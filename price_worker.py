@@ -0,0 +1,262 @@
+import json
+import multiprocessing
+import struct
+import threading
+import time
+from array import array
+from multiprocessing import shared_memory
+from types import MappingProxyType
+
+from price_providers import EMPTY_SNAPSHOT, PriceProvider, PriceSnapshot, format_price
+
+# Shared price table layout: a header, one fixed-size slot per coin in watchlist
+# order, then a small area for the worker's fetch statistics. Every field is
+# 8-byte aligned. Slots and the stats area are seqlocks: the writer makes the
+# sequence counter odd, writes, then makes it even again, and readers retry
+# until they see the same even counter before and after reading.
+HEADER = struct.Struct('=QdQ')  # publish version, timestamp of the latest publish, number of slots
+SLOT = struct.Struct('=QdB23s')  # sequence counter, price, text length, formatted text (UTF-8)
+SEQ = struct.Struct('=Q')
+STATS = struct.Struct('=QQ')  # sequence counter, JSON length
+STATS_SIZE = 4096
+TEXT_SIZE = 23
+READ_RETRIES = 100  # A slot left half-written by a killed worker is skipped after this many tries
+
+
+class SharedPriceTable:
+    """Fixed-layout price table in shared memory, written by one process and read by others.
+
+    create() allocates a table for a list of coin ids and attach() opens it
+    by name in another process; both sides must use the same ids in the same
+    order.
+    """
+
+    def __init__(self, shm, ids, owner=False):
+        self.shm = shm
+        self.name = shm.name
+        self.buf = shm.buf
+        self.ids = list(ids)
+        self.index = {coin_id: i for i, coin_id in enumerate(self.ids)}
+        self.owner = owner
+        self.stats_offset = HEADER.size + SLOT.size * len(self.ids)
+        if HEADER.unpack_from(self.buf, 0)[2] != len(self.ids):
+            raise ValueError(f"Shared price table {self.name} does not have {len(self.ids)} slots")
+
+    @classmethod
+    def create(cls, ids):
+        ids = list(ids)
+        shm = shared_memory.SharedMemory(create=True, size=HEADER.size + SLOT.size * len(ids) + STATS.size + STATS_SIZE)
+        HEADER.pack_into(shm.buf, 0, 0, 0.0, len(ids))  # The rest starts zeroed: no slot written yet
+        return cls(shm, ids, owner=True)
+
+    @classmethod
+    def attach(cls, name, ids):
+        return cls(shared_memory.SharedMemory(name=name), ids)
+
+    def header(self):
+        # (version, timestamp) of the latest publish
+        return HEADER.unpack_from(self.buf, 0)[:2]
+
+    def write(self, prices, formatted, timestamp):
+        # Single writer: coins that aren't in the table are ignored, the version is bumped once all slots are written
+        buf = self.buf
+        for coin_id, price in prices.items():
+            i = self.index.get(coin_id)
+            if i is None:
+                continue
+            offset = HEADER.size + SLOT.size * i
+            seq = (SEQ.unpack_from(buf, offset)[0] + 1) | 1  # Odd, also after a writer died mid-write
+            SEQ.pack_into(buf, offset, seq)
+            text = formatted[coin_id].encode()[:TEXT_SIZE]
+            SLOT.pack_into(buf, offset, seq, price, len(text), text)
+            SEQ.pack_into(buf, offset, seq + 1)
+        version = HEADER.unpack_from(buf, 0)[0] + 1
+        HEADER.pack_into(buf, 0, version, timestamp, len(self.ids))
+        return version
+
+    def read_changed(self, seqs):
+        # Yields (index, price, text) for every slot whose counter differs from seqs[index], and updates seqs
+        buf = self.buf
+        for i in range(len(self.ids)):
+            offset = HEADER.size + SLOT.size * i
+            if SEQ.unpack_from(buf, offset)[0] == seqs[i]:
+                continue
+            for _ in range(READ_RETRIES):
+                seq, price, length, text = SLOT.unpack_from(buf, offset)
+                if not seq & 1 and SEQ.unpack_from(buf, offset)[0] == seq:
+                    seqs[i] = seq
+                    yield i, price, text[:length].decode('utf-8', 'replace')
+                    break
+                time.sleep(0)
+
+    def write_stats(self, stats):
+        data = json.dumps(stats, separators=(',', ':')).encode()
+        if len(data) > STATS_SIZE:
+            return
+        offset = self.stats_offset
+        seq = (SEQ.unpack_from(self.buf, offset)[0] + 1) | 1
+        STATS.pack_into(self.buf, offset, seq, len(data))
+        self.buf[offset + STATS.size:offset + STATS.size + len(data)] = data
+        SEQ.pack_into(self.buf, offset, seq + 1)
+
+    def read_stats(self):
+        offset = self.stats_offset
+        for _ in range(READ_RETRIES):
+            seq, length = STATS.unpack_from(self.buf, offset)
+            if not seq:
+                return {}
+            data = bytes(self.buf[offset + STATS.size:offset + STATS.size + min(length, STATS_SIZE)])
+            if not seq & 1 and SEQ.unpack_from(self.buf, offset)[0] == seq:
+                try:
+                    return json.loads(data)
+                except ValueError:
+                    return {}
+            time.sleep(0)
+        return {}
+
+    def close(self):
+        self.buf = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A reader still holds a view; the mapping goes away with the process
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SharedPriceBoard:
+    """PriceBoard whose prices live in a SharedPriceTable.
+
+    publish() formats the prices and writes them into the table, so it can
+    run in another process than the one reading board.snapshot. follow()
+    starts a thread that watches the table's version and, after each
+    publish, reads only the changed slots into a new PriceSnapshot, records
+    them into the PriceHistory, calls on_update(snapshot, changed_prices) and
+    swaps the snapshot in with one reference assignment, so the render loop
+    reads board.snapshot without locks, as with PriceBoard.
+    """
+
+    def __init__(self, table, formatter=format_price, history=None):
+        self.table = table
+        self.formatter = formatter
+        self.history = history
+        self.on_update = None
+        self.snapshot = EMPTY_SNAPSHOT
+        self._seqs = array('Q', [0]) * len(table.ids)
+        self._refresh_lock = threading.Lock()  # Serializes refreshes only; readers never take it
+
+    def refresh(self):
+        # Pick up whatever was published since the last refresh; returns the current snapshot
+        with self._refresh_lock:
+            previous = self.snapshot
+            version, timestamp = self.table.header()
+            if version == previous.version:
+                return previous
+            ids = self.table.ids
+            changed = {}
+            formatted = dict(previous.formatted)
+            for i, price, text in self.table.read_changed(self._seqs):
+                changed[ids[i]] = price
+                formatted[ids[i]] = text
+            prices = dict(previous.prices)
+            prices.update(changed)
+            if self.history is not None:
+                self.history.record(changed, timestamp)
+            snapshot = PriceSnapshot(version, timestamp, MappingProxyType(prices), MappingProxyType(formatted))
+            if changed and self.on_update is not None:
+                self.on_update(snapshot, changed)
+            self.snapshot = snapshot
+            return snapshot
+
+    def follow(self, interval=0.02):
+        def watch():
+            while True:
+                try:
+                    self.refresh()
+                except (TypeError, ValueError):
+                    return  # The table was closed
+                time.sleep(interval)
+        threading.Thread(target=watch, name='price-table-follower', daemon=True).start()
+
+    def publish(self, prices, timestamp=None):
+        formatted = {coin_id: self.formatter(price) for coin_id, price in prices.items()}
+        self.table.write(prices, formatted, timestamp if timestamp is not None else time.time())
+        return self.refresh()
+
+
+class WorkerProvider(PriceProvider):
+    # Stands in for the provider that runs in the worker process and reports its stats from the shared table
+    def __init__(self, provider, table, supervisor):
+        self.name = provider.name
+        self.cacheable = provider.cacheable
+        self.table = table
+        self.supervisor = supervisor
+
+    def stats(self):
+        stats = self.table.read_stats()
+        stats['worker_restarts'] = self.supervisor.restarts
+        return stats
+
+
+class PriceWorkerSupervisor:
+    """Runs target(*args) in a separate process and restarts it when it dies.
+
+    A worker that exits with status 0 has finished and is not restarted.
+    Restarts back off from min_backoff to max_backoff seconds while the
+    worker keeps dying quickly, and on_exit(exitcode, delay) is called
+    before each one. Has start() like the price thread it replaces.
+    """
+
+    def __init__(self, target, args=(), table=None, on_exit=None, min_backoff=1.0, max_backoff=60.0, stable_after=60.0):
+        self.target = target
+        self.args = args
+        self.table = table
+        self.on_exit = on_exit
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.restarts = 0
+        self.process = None
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._supervise, name='price-worker-supervisor', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _supervise(self):
+        # spawn rather than fork: the display process has threads and a terminal set up
+        context = multiprocessing.get_context('spawn')
+        backoff = self.min_backoff
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            self.process = context.Process(target=self.target, args=self.args, name='price-worker', daemon=True)
+            self.process.start()
+            self.process.join()
+            exitcode = self.process.exitcode
+            if self._stopping.is_set() or exitcode == 0:
+                return
+            if time.monotonic() - started >= self.stable_after:
+                backoff = self.min_backoff
+            if self.on_exit is not None:
+                self.on_exit(exitcode, backoff)
+            if self._stopping.wait(backoff):
+                return
+            self.restarts += 1
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def stop(self, timeout=2.0):
+        # Stop the worker and free the shared table; safe to call more than once
+        self._stopping.set()
+        process = self.process
+        if process is not None and process.is_alive():
+            process.terminate()
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        if self.table is not None and self.table.buf is not None:
+            self.table.close()
+
@@ -0,0 +1,132 @@
+import gzip
+import json
+import queue
+import struct
+import threading
+import time
+
+from frame_stream import HEADER, KEYFRAME, paint
+
+# A recording is a gzip stream of MAGIC followed by records. Frame records hold
+# one frame_stream frame, price records the JSON of one price update.
+MAGIC = b'MXR1'
+RECORD = struct.Struct('!cdI')  # kind, seconds since the recording started, payload length
+FRAME = b'F'
+PRICES = b'P'
+
+
+class Recorder:
+    """Writes frames and price updates to a recording file.
+
+    frame() and prices() only queue the data; a background thread compresses
+    and writes it, so the render loop never waits on the disk.
+    """
+
+    def __init__(self, path, clock=time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.start = clock()
+        self.frames = 0
+        self._queue = queue.SimpleQueue()
+        self._file = gzip.open(path, 'wb', compresslevel=1)
+        self._file.write(MAGIC)
+        self._thread = threading.Thread(target=self._write_records, daemon=True)
+        self._thread.start()
+
+    def frame(self, message):
+        if message is not None:
+            self._queue.put((FRAME, self.clock() - self.start, message))
+            self.frames += 1
+
+    def prices(self, snapshot, prices):
+        # Same signature as price_providers.record_snapshot() without the path
+        payload = json.dumps({'version': snapshot.version, 'time': snapshot.timestamp, 'prices': prices}).encode()
+        self._queue.put((PRICES, self.clock() - self.start, payload))
+
+    def _write_records(self):
+        write = self._file.write
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            kind, elapsed, payload = record
+            write(RECORD.pack(kind, elapsed, len(payload)))
+            write(payload)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+
+def read_records(path):
+    # Yields (kind, elapsed, payload) for every record in a recording
+    with gzip.open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a frame recording")
+        while True:
+            header = file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return  # End of the recording, or the tail of one that was cut off
+            kind, elapsed, length = RECORD.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+            yield kind, elapsed, payload
+
+
+def is_recording(path):
+    try:
+        with gzip.open(path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def read_prices(path):
+    # The price updates in a recording as (time, prices) pairs, like ReplayProvider's records
+    return [(record['time'], record['prices'])
+            for record in (json.loads(payload) for kind, _, payload in read_records(path) if kind == PRICES)]
+
+
+def play(path, screen, speed=1.0, translate=None, stop=None, resize=None, clock=time.perf_counter, sleep=time.sleep):
+    """Paint the frames of a recording onto screen.
+
+    speed scales the recorded timing, and 0 plays as fast as possible.
+    stop() is checked after every frame and ends playback when it returns
+    True. resize(height, width) is called with the recorded screen size at
+    every keyframe. Returns playback statistics.
+    """
+    started = clock()
+    paint_times = []
+    cells = 0
+    elapsed = 0.0
+    for kind, elapsed, payload in read_records(path):
+        if kind != FRAME:
+            continue
+        if speed > 0:
+            delay = started + elapsed / speed - clock()
+            if delay > 0:
+                sleep(delay)
+        frame_kind, height, width, _ = HEADER.unpack_from(payload)
+        start = clock()
+        if frame_kind == KEYFRAME and resize is not None:
+            resize(height, width)
+        cells += paint(screen, frame_kind, memoryview(payload)[HEADER.size:], translate)
+        screen.refresh()
+        paint_times.append(clock() - start)
+        if stop is not None and stop():
+            break
+
+    wall_time = clock() - started
+    paint_times.sort()
+    frames = len(paint_times)
+    return {
+        'frames': frames,
+        'recorded_seconds': elapsed,
+        'wall_seconds': wall_time,
+        'fps': frames / wall_time if wall_time else 0.0,
+        'p50_ms': paint_times[frames // 2] * 1000 if frames else 0.0,
+        'p99_ms': paint_times[min(frames - 1, int(0.99 * frames))] * 1000 if frames else 0.0,
+        'cells_per_frame': cells / frames if frames else 0.0,
+    }
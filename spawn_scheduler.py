@@ -0,0 +1,157 @@
+import threading
+import time
+from array import array
+
+
+class AliasTable:
+    """Samples an index with probability proportional to its weight in O(1) (Vose's alias method).
+
+    Building the table is O(n), so it is only rebuilt when the weights
+    change. Each slot holds a probability and an alias: a sample picks a
+    slot uniformly and returns it or its alias.
+    """
+
+    def __init__(self, weights):
+        n = len(weights)
+        weights = [w if w > 0 else 0.0 for w in weights]  # Negative and NaN weights count as 0
+        total = sum(weights)
+        if not total > 0:
+            raise ValueError("An alias table needs at least one positive weight")
+        scaled = [w * n / total for w in weights]
+        self.n = n
+        self.prob = array('d', [1.0]) * n
+        self.alias = array('l', range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large[-1]
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(large.pop())
+        # Whatever is left over is 1 up to rounding and keeps prob 1
+
+    def __len__(self):
+        return self.n
+
+    def sample(self, u):
+        # One uniform float in [0, 1): the integer part of u * n picks the slot, the fraction decides slot or alias
+        x = u * self.n
+        i = min(int(x), self.n - 1)
+        return i if x - i < self.prob[i] else self.alias[i]
+
+
+class SpawnPicker:
+    """Chooses the coin for each new ticker.
+
+    weights are fixed per-coin weights, or None for equal airtime. With a
+    PriceHistory, each weight is also scaled by 1 + the coin's absolute
+    percent change since the previous poll, so coins that are moving show
+    up more often. Rebuilding the alias table is O(n), so refresh() only
+    starts a rebuild in a background thread, for a new price snapshot
+    version and at most every rebuild_interval seconds; picks keep using the
+    current table until the new one is swapped in.
+    """
+
+    def __init__(self, ids, weights=None, history=None, max_change=100.0, rebuild_interval=1.0, clock=time.monotonic):
+        self.ids = ids
+        self.weights = weights
+        self.history = history
+        self.max_change = max_change
+        self.rebuild_interval = rebuild_interval
+        self.clock = clock
+        self.version = None
+        self.table = None
+        self._building = False
+        self._next_build = 0.0
+        self._build()
+
+    def _build(self):
+        weights = self.weights
+        if self.history is not None and self.ids:
+            change = self.history.change
+            weights = weights or [1.0] * len(self.ids)
+            # The change since the last poll is O(1) per coin; windowed changes walk the ring buffers
+            weights = [weight * (1.0 + min(abs(change(coin_id) or 0.0), self.max_change))
+                       for coin_id, weight in zip(self.ids, weights)]
+        try:
+            self.table = AliasTable(weights) if weights else None
+        except ValueError:
+            self.table = None  # Nothing has a positive weight: fall back to equal airtime
+
+    def refresh(self, version):
+        # Called from the render thread, so it never builds the table itself
+        if self.history is None or version == self.version or self._building:
+            return
+        now = self.clock()
+        if now < self._next_build:
+            return
+        self.version = version
+        self._next_build = now + self.rebuild_interval
+        self._building = True
+        threading.Thread(target=self._rebuild, name='spawn-weights', daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            self._build()  # Swaps in the new table with one reference assignment
+        finally:
+            self._building = False
+
+    def pick(self, rng):
+        # Index into ids; rng is an AnimationRNG
+        table = self.table
+        if table is not None:
+            return table.sample(rng.chance())
+        return rng.randrange(len(self.ids))
+
+
+class ColumnOccupancy:
+    """Screen columns that hold a falling ticker.
+
+    occupied is a bitmap with one byte per column. free lists the other
+    columns in no particular order, and position maps each column to its
+    index in free (-1 when taken), so taking a random free column and
+    releasing one are both O(1).
+    """
+
+    def __init__(self, width, occupied=()):
+        self.resize(width, occupied)
+
+    def resize(self, width, occupied=()):
+        self.width = width
+        self.occupied = bytearray(width)
+        for x in occupied:
+            if 0 <= x < width:
+                self.occupied[x] = 1
+        self.free = array('l', [x for x in range(width) if not self.occupied[x]])
+        self.position = array('l', [-1]) * width
+        for i, x in enumerate(self.free):
+            self.position[x] = i
+
+    def __len__(self):
+        return len(self.free)
+
+    def _take(self, x):
+        i = self.position[x]
+        last = self.free.pop()
+        if last != x:
+            self.free[i] = last
+            self.position[last] = i
+        self.position[x] = -1
+        self.occupied[x] = 1
+
+    def take_random(self, u):
+        # A free column picked by the uniform float u, now marked occupied, or None when every column is taken
+        if not self.free:
+            return None
+        x = self.free[min(int(u * len(self.free)), len(self.free) - 1)]
+        self._take(x)
+        return x
+
+    def release(self, x):
+        if 0 <= x < self.width and self.occupied[x]:
+            self.occupied[x] = 0
+            self.position[x] = len(self.free)
+            self.free.append(x)
@@ -0,0 +1,77 @@
+import json
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# A crypto list file and how much display time its coins get relative to other lists
+WatchSource = namedtuple('WatchSource', ['path', 'weight'])
+
+
+def parse_source(text):
+    # "path" or "path:weight"; a suffix that isn't a number (e.g. a Windows drive) stays part of the path
+    path, sep, weight = text.rpartition(':')
+    if sep:
+        try:
+            return WatchSource(path, float(weight))
+        except ValueError:
+            pass
+    return WatchSource(text, 1.0)
+
+
+def load_list(path):
+    # Raises OSError or ValueError, so a half-written or hand-broken list can be rejected as a whole
+    with open(path, 'r') as file:
+        config = json.load(file)
+    cryptos = config.get('cryptos') if isinstance(config, dict) else None
+    if not isinstance(cryptos, list):
+        raise ValueError(f"{path} has no \"cryptos\" list")
+    for crypto in cryptos:
+        if not isinstance(crypto, dict) or not isinstance(crypto.get('id'), str) or not isinstance(crypto.get('ticker'), str):
+            raise ValueError(f"{path} has a crypto entry without an id and ticker: {str(crypto)[:80]}")
+    return config
+
+
+class Watchlist:
+    """Several crypto lists merged into one de-duplicated id index.
+
+    cryptos has one entry per coin id, in first-seen order, so a coin that is
+    in several lists is fetched and formatted once. Each list's weight is
+    spread over its coins, and a coin in several lists gets the sum. ranks
+    holds each coin's best position in the lists it is in, which is its
+    market-cap rank for lists made by list_builder.
+    """
+
+    def __init__(self, sources, configs):
+        self.sources = list(sources)
+        self.cryptos = []
+        weights = {}
+        ranks = {}
+        index = {}
+        for source, config in zip(self.sources, configs):
+            cryptos = config.get('cryptos', [])
+            if not cryptos:
+                continue
+            share = source.weight / len(cryptos)
+            for rank, crypto in enumerate(cryptos):
+                if crypto['id'] not in index:
+                    index[crypto['id']] = len(self.cryptos)
+                    self.cryptos.append(crypto)
+                weights[crypto['id']] = weights.get(crypto['id'], 0.0) + share
+                ranks[crypto['id']] = min(rank, ranks.get(crypto['id'], rank))
+        self.weights = [weights[crypto['id']] for crypto in self.cryptos]
+        self.ranks = [ranks[crypto['id']] for crypto in self.cryptos]
+
+    @property
+    def ids(self):
+        return [crypto['id'] for crypto in self.cryptos]
+
+    @property
+    def name(self):
+        return '+'.join(source.path for source in self.sources)
+
+
+def load_watchlist(sources):
+    # Read every list file concurrently and merge them
+    sources = list(sources)
+    with ThreadPoolExecutor(max_workers=max(1, len(sources))) as executor:
+        configs = list(executor.map(lambda source: load_list(source.path), sources))
+    return Watchlist(sources, configs)